@@ -1,9 +1,50 @@
-from django.contrib import admin
+import logging
 
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.db import models, transaction
+from django.template.response import TemplateResponse
+
+from blog.forms import StreamedImageField
 from blog.models import Category, Comment, Location, Post
+from blog.paginators import EstimatedCountPaginator
+from blog.search import search_posts
+from blog.service import (change_comment_count, create_comment,
+                          delete_posts, remove_comment, remove_comments,
+                          update_comment, update_posts)
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryAdmin(admin.ModelAdmin):
+    search_fields = ('title',)
+
+
+admin.site.register(Category, CategoryAdmin)
+
+
+class LocationAdmin(admin.ModelAdmin):
+    search_fields = ('name',)
 
-admin.site.register(Category)
-admin.site.register(Location)
+
+admin.site.register(Location, LocationAdmin)
+
+
+class MoveToCategoryForm(forms.Form):
+    category = forms.ModelChoiceField(
+        Category.objects.all(), label='Категория'
+    )
+
+
+class SearchChangeList(ChangeList):
+    """Keep the rank order of search results unless a column is sorted."""
+
+    def get_ordering(self, request, queryset):
+        if self.query and ORDER_VAR not in self.params:
+            return [*queryset.query.order_by, '-pk']
+        return super().get_ordering(request, queryset)
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -16,14 +57,117 @@ class PostAdmin(admin.ModelAdmin):
     list_editable = (
         'is_published',
         'pub_date',
-        'category'
     )
 
     search_fields = ('title',)
     list_filter = ('location',)
     list_display_links = ('title',)
+    list_select_related = ('category',)
+    autocomplete_fields = ('category', 'location', 'author')
+    date_hierarchy = 'pub_date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = 'Не задано'
     verbose_name = 'Публикацию'
+    # The admin must reject truncated uploads just like PostForm.
+    formfield_overrides = {
+        models.ImageField: {'form_class': StreamedImageField},
+    }
+    actions = (
+        'publish', 'unpublish', 'move_to_category', 'delete_with_comments'
+    )
+
+    def get_changelist(self, request, **kwargs):
+        return SearchChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        # Collects and lists every object; delete_with_comments replaces it.
+        actions.pop('delete_selected', None)
+        return actions
+
+    @admin.action(
+        description='Опубликовать выбранные публикации',
+        permissions=('change',)
+    )
+    def publish(self, request, queryset):
+        self.run_in_chunks(
+            request, update_posts(queryset, is_published=True),
+            'Опубликовано публикаций'
+        )
+
+    @admin.action(
+        description='Снять с публикации выбранные публикации',
+        permissions=('change',)
+    )
+    def unpublish(self, request, queryset):
+        self.run_in_chunks(
+            request, update_posts(queryset, is_published=False),
+            'Снято с публикации'
+        )
+
+    @admin.action(
+        description='Перенести выбранные публикации в категорию',
+        permissions=('change',)
+    )
+    def move_to_category(self, request, queryset):
+        form = MoveToCategoryForm(
+            request.POST if 'apply' in request.POST else None
+        )
+        if not form.is_valid():
+            return self.confirm_action(
+                request, queryset, 'Перенос публикаций в категорию', form
+            )
+        self.run_in_chunks(
+            request,
+            update_posts(queryset, category=form.cleaned_data['category']),
+            'Перенесено публикаций'
+        )
+
+    @admin.action(
+        description='Удалить выбранные публикации вместе с комментариями',
+        permissions=('delete',)
+    )
+    def delete_with_comments(self, request, queryset):
+        if 'apply' not in request.POST:
+            return self.confirm_action(
+                request, queryset,
+                'Удаление публикаций вместе с комментариями'
+            )
+        # Logged up front like delete_selected, while the rows still exist.
+        posts = queryset.select_related(None).only('pk', 'title')
+        for post in posts.iterator():
+            self.log_deletion(request, post, str(post))
+        self.run_in_chunks(
+            request, delete_posts(queryset), 'Удалено публикаций'
+        )
+
+    def run_in_chunks(self, request, chunks, message):
+        done = chunk_count = 0
+        for chunk_count, done in enumerate(chunks, 1):
+            logger.info('%s: %d (пакет %d)', message, done, chunk_count)
+        self.message_user(
+            request, f'{message}: {done}, пакетов: {chunk_count}.',
+            messages.SUCCESS
+        )
+
+    def confirm_action(self, request, queryset, title, form=None):
+        return TemplateResponse(request, 'admin/blog/post/bulk_action.html', {
+            **self.admin_site.each_context(request),
+            'title': title,
+            'opts': self.model._meta,
+            'form': form,
+            'count': queryset.count(),
+            'action': request.POST['action'],
+            'select_across': request.POST.get('select_across', '0'),
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+        })
 
 
 admin.site.register(Post, PostAdmin)
@@ -38,7 +182,29 @@ class CommentAdmin(admin.ModelAdmin):
     )
     list_editable = ('text',)
     search_fields = ('text',)
+    list_select_related = ('author', 'post')
+    autocomplete_fields = ('author', 'post')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = 'Не задано'
 
+    def save_model(self, request, obj, form, change):
+        if not change:
+            create_comment(obj)
+            return
+        if 'post' not in form.changed_data:
+            update_comment(obj)
+            return
+        with transaction.atomic():
+            obj.save()
+            change_comment_count(form.initial['post'], -1)
+            change_comment_count(obj.post_id, 1)
+
+    def delete_model(self, request, obj):
+        remove_comment(obj)
+
+    def delete_queryset(self, request, queryset):
+        remove_comments(queryset)
+
 
 admin.site.register(Comment, CommentAdmin)
@@ -0,0 +1,48 @@
+import asyncio
+from functools import wraps
+from weakref import WeakKeyDictionary
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from . import views
+
+_limits = WeakKeyDictionary()
+
+
+def _limit():
+    # A semaphore belongs to the event loop it was first awaited in.
+    loop = asyncio.get_running_loop()
+    if loop not in _limits:
+        _limits[loop] = asyncio.Semaphore(settings.ASYNC_DB_CONCURRENCY)
+    return _limits[loop]
+
+
+def _run(view, request, *args, **kwargs):
+    # Pool threads are outside the request_started/request_finished cycle
+    # that recycles connections, so expired ones are closed here.
+    close_old_connections()
+    return view(request, *args, **kwargs)
+
+
+def offloaded(view):
+    """Serve a synchronous view from the thread pool, not the ASGI thread.
+
+    Django runs synchronous views one at a time on a single thread under
+    ASGI. Here up to ASYNC_DB_CONCURRENCY requests query and render in
+    parallel while the event loop keeps serving slow clients.
+    """
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        async with _limit():
+            return await sync_to_async(_run, thread_sensitive=False)(
+                view, request, *args, **kwargs
+            )
+    return wrapper
+
+
+index = offloaded(views.index)
+category_posts = offloaded(views.category_posts)
+profile_info = offloaded(views.profile_info)
+post_detail = offloaded(views.post_detail)
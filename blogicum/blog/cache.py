@@ -0,0 +1,169 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import transaction
+from django.db.models import Min
+from django.http import HttpResponse
+from django.utils import timezone
+
+from .models import Post
+
+POST_CARD_FRAGMENT = 'post_card'
+LISTING_VERSION_KEY = 'listing_version:{}'
+LISTING_PAGE_KEY = 'listing_page:{}:{}:{}'
+GLOBAL_SCOPE = 'all'
+
+_batch = ContextVar('invalidation_batch', default=None)
+
+
+@contextmanager
+def invalidation_batch():
+    """Collect card and listing invalidations and apply them once on exit."""
+    if _batch.get() is not None:
+        yield
+        return
+    batch = {'cards': set(), 'listings': set()}
+    token = _batch.set(batch)
+    try:
+        yield
+    finally:
+        _batch.reset(token)
+        invalidate_post_cards(batch['cards'])
+        bump_listings(batch['listings'])
+
+
+def _now_and_on_commit(action):
+    action()
+    # A reader between the write and the commit may re-cache stale data.
+    transaction.on_commit(action)
+
+
+def post_card_keys(post_ids):
+    """Fragment keys of the cards of ``post_ids`` as they are stored now.
+
+    A card is keyed by id and updated_at, so any write that touches the
+    row retires it; this drops cards whose related rows changed.
+    """
+    if not post_ids:
+        return []
+    stamps = Post.objects.filter(pk__in=post_ids).values_list(
+        'pk', 'updated_at'
+    )
+    return [
+        make_template_fragment_key(POST_CARD_FRAGMENT, [pk, updated_at])
+        for pk, updated_at in stamps
+    ]
+
+
+def invalidate_post_cards(post_ids):
+    batch = _batch.get()
+    if batch is not None:
+        batch['cards'].update(post_ids)
+        return
+    keys = post_card_keys(list(post_ids))
+    if keys:
+        _now_and_on_commit(lambda: cache.delete_many(keys))
+
+
+def index_listing():
+    return 'index', {}
+
+
+def category_listing(category):
+    return f'category:{category}', {'category__slug': category}
+
+
+def profile_listing(username):
+    return f'profile:{username}', {'author__username': username}
+
+
+def post_listing_scopes(category_slug, username):
+    scopes = {index_listing()[0], profile_listing(username)[0]}
+    if category_slug:
+        scopes.add(category_listing(category_slug)[0])
+    return scopes
+
+
+def stored_listing_scopes(post_id):
+    stored = Post.objects.filter(pk=post_id).values_list(
+        'category__slug', 'author__username'
+    ).first()
+    return post_listing_scopes(*stored) if stored else set()
+
+
+def bump_listings(scopes):
+    batch = _batch.get()
+    if batch is not None:
+        batch['listings'].update(scopes)
+        return
+    keys = [LISTING_VERSION_KEY.format(scope) for scope in scopes]
+    _now_and_on_commit(lambda: cache.set_many(
+        {key: time.time() for key in keys}, timeout=None
+    ))
+
+
+def get_listing_versions(scopes):
+    keys = [LISTING_VERSION_KEY.format(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # An evicted version must not resurrect pages cached under
+            # an older one, so start it from the current time.
+            cache.add(key, time.time(), timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def seconds_to_next_publication(lookup):
+    now = timezone.now()
+    next_pub_date = Post.objects.filter(
+        is_published=True, pub_date__gt=now, **lookup
+    ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
+    if next_pub_date is None:
+        return None
+    return (next_pub_date - now).total_seconds()
+
+
+def cache_anonymous_page(listing):
+    """Cache the page for anonymous GET requests.
+
+    ``listing`` maps the view kwargs to the version scope of the page and
+    the Post lookup that selects its posts. A page expires at the next
+    scheduled publication in that listing.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            scope, lookup = listing(*args, **kwargs)
+            versions = get_listing_versions((GLOBAL_SCOPE, scope))
+            page = md5(repr((
+                request.GET.get('page'), request.GET.get('cursor')
+            )).encode()).hexdigest()
+            key = LISTING_PAGE_KEY.format(
+                scope, page, '-'.join(map(str, versions))
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            timeout = settings.ANONYMOUS_PAGE_CACHE_TIMEOUT
+            pending = seconds_to_next_publication(lookup)
+            if pending is not None:
+                timeout = min(timeout, pending)
+            cache.set(
+                key, (response.content, response['Content-Type']), timeout
+            )
+            return response
+        return wrapper
+    return decorator
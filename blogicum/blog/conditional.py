@@ -0,0 +1,90 @@
+from calendar import timegm
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+from hashlib import md5
+
+from django.db.models import Max
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .cache import GLOBAL_SCOPE, get_listing_versions
+from .service import get_posts_query_set
+
+
+def respond_conditionally(request, etag, last_modified, view):
+    """Return 304/412 for a matching conditional GET, else call ``view``."""
+    if etag is not None:
+        etag = quote_etag(etag)
+    if last_modified is not None:
+        last_modified = timegm(last_modified.utctimetuple())
+    response = None
+    if request.method in ('GET', 'HEAD'):
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+    if response is None:
+        response = view()
+    if response.status_code in (200, 304):
+        if etag is not None and not response.has_header('ETag'):
+            response['ETag'] = etag
+        if (last_modified is not None
+                and not response.has_header('Last-Modified')):
+            response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def conditional_page(validators):
+    """Answer conditional GETs without running the view.
+
+    ``validators`` returns ``(etag, last_modified)`` for the view
+    arguments.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            return respond_conditionally(
+                request, *validators(request, *args, **kwargs),
+                lambda: view(request, *args, **kwargs)
+            )
+        return wrapper
+    return decorator
+
+
+def _make_etag(*parts):
+    return md5(repr(parts).encode()).hexdigest()
+
+
+def _from_timestamp(value):
+    return datetime.fromtimestamp(value, tz=dt_timezone.utc)
+
+
+def listing_validators(listing):
+    def validators(request, *args, **kwargs):
+        scope, lookup = listing(*args, **kwargs)
+        versions = get_listing_versions((GLOBAL_SCOPE, scope))
+        last_pub_date = get_posts_query_set().filter(**lookup).aggregate(
+            last_pub_date=Max('pub_date')
+        )['last_pub_date']
+        last_modified = max(
+            [_from_timestamp(version) for version in versions]
+            + ([last_pub_date] if last_pub_date else [])
+        )
+        etag = _make_etag(
+            scope, versions, last_pub_date, request.user.pk,
+            request.GET.get('page'), request.GET.get('cursor'),
+        )
+        return etag, last_modified
+    return validators
+
+
+def post_detail_validators(request, post):
+    global_version, = get_listing_versions((GLOBAL_SCOPE,))
+    last_modified = max(post.updated_at, _from_timestamp(global_version))
+    etag = _make_etag(
+        post.pk, post.updated_at, post.comment_count, global_version,
+        request.user.pk
+    )
+    return etag, last_modified
@@ -1,3 +1,7 @@
 NUMBER_OF_POSTS_ON_PAGE = 10
+NUMBER_OF_COMMENTS_ON_PAGE = 50
 TITLE_MAX_LENGTH = 256
 PREVIEW_LIMIT = 20
+IMAGE_VARIANT_WIDTHS = (320, 640, 960)
+IMAGE_VARIANT_QUALITY = 80
+BULK_CHUNK_SIZE = 1000
@@ -1,8 +1,52 @@
 from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
 
 from blog.models import Comment, Post, User
 
 
+class StreamedImageField(forms.ImageField):
+    """Validate an upload by its header instead of decoding the bitmap."""
+
+    def to_python(self, data):
+        uploaded = forms.FileField.to_python(self, data)
+        if uploaded is None:
+            return None
+        if (
+            getattr(uploaded, 'oversized', False)
+            or uploaded.size > settings.MAX_IMAGE_UPLOAD_SIZE
+        ):
+            raise ValidationError(
+                'Размер файла не должен превышать %s.'
+                % filesizeformat(settings.MAX_IMAGE_UPLOAD_SIZE),
+                code='file_too_large'
+            )
+        if hasattr(uploaded, 'temporary_file_path'):
+            source = uploaded.temporary_file_path()
+        else:
+            source = uploaded
+        try:
+            with Image.open(source) as image:
+                width, height = image.size
+                uploaded.image = image
+                uploaded.content_type = Image.MIME.get(image.format)
+        except Exception as error:
+            raise ValidationError(
+                self.error_messages['invalid_image'], code='invalid_image'
+            ) from error
+        if width * height > settings.MAX_IMAGE_PIXELS:
+            raise ValidationError(
+                'Изображение больше %(limit)s пикселей.',
+                code='too_many_pixels',
+                params={'limit': settings.MAX_IMAGE_PIXELS}
+            )
+        if hasattr(uploaded, 'seek') and callable(uploaded.seek):
+            uploaded.seek(0)
+        return uploaded
+
+
 class PostForm(forms.ModelForm):
 
     class Meta:
@@ -14,6 +58,7 @@ class PostForm(forms.ModelForm):
         widgets = {
             'pub_date': forms.DateTimeInput(attrs={'type': 'datetime-local'})
         }
+        field_classes = {'image': StreamedImageField}
 
 
 class CommentForm(forms.ModelForm):
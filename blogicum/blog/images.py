@@ -0,0 +1,112 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .cache import bump_listings, invalidate_post_cards, stored_listing_scopes
+from .constants import IMAGE_VARIANT_QUALITY, IMAGE_VARIANT_WIDTHS
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+VARIANT_FORMATS = {'webp': 'WEBP', 'jpg': 'JPEG'}
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_WORKERS, thread_name_prefix='post-images'
+)
+
+
+def variant_name(name, width, extension):
+    return f'{os.path.splitext(name)[0]}_{width}w.{extension}'
+
+
+def all_variant_names(name):
+    return [
+        variant_name(name, width, extension)
+        for width in IMAGE_VARIANT_WIDTHS
+        for extension in VARIANT_FORMATS
+    ]
+
+
+def existing_variants(field_file, extension):
+    return [
+        (variant_name(field_file.name, width, extension), width)
+        for width in IMAGE_VARIANT_WIDTHS
+        if field_file.storage.exists(
+            variant_name(field_file.name, width, extension)
+        )
+    ]
+
+
+def generate_variants(storage, name):
+    """Write downscaled WebP and JPEG copies next to the original."""
+    with storage.open(name) as original:
+        image = ImageOps.exif_transpose(Image.open(original))
+        image = image.convert('RGB')
+    for width in IMAGE_VARIANT_WIDTHS:
+        if width >= image.width:
+            break
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for extension, image_format in VARIANT_FORMATS.items():
+            buffer = BytesIO()
+            resized.save(
+                buffer, image_format, quality=IMAGE_VARIANT_QUALITY,
+                optimize=True
+            )
+            target = variant_name(name, width, extension)
+            storage.delete(target)
+            storage.save(target, ContentFile(buffer.getvalue()))
+
+
+def _generate_for_post(post_id, storage, name):
+    try:
+        generate_variants(storage, name)
+        invalidate_post_cards([post_id])
+        bump_listings(stored_listing_scopes(post_id))
+    except Exception:
+        logger.exception('Не удалось обработать изображение %s', name)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(post):
+    """Generate the variants in a worker thread once the post is saved."""
+    args = (post.pk, post.image.storage, post.image.name)
+    transaction.on_commit(lambda: _executor.submit(_generate_for_post, *args))
+
+
+def is_recent(storage, name, min_age=None):
+    """Whether ``name`` was written or reused within ``min_age`` seconds.
+
+    Such a file may belong to an upload whose post is not committed yet.
+    ``min_age`` defaults to ORPHAN_IMAGE_MIN_AGE.
+    """
+    if min_age is None:
+        min_age = settings.ORPHAN_IMAGE_MIN_AGE
+    cutoff = timezone.now() - timedelta(seconds=min_age)
+    return storage.get_modified_time(name) >= cutoff
+
+
+def release_image(storage, name):
+    """Delete an image and its variants once no post references it.
+
+    Recent files are left to collect_orphan_images.
+    """
+    def release():
+        if (
+            Post.objects.filter(image=name).exists()
+            or not storage.exists(name)
+            or is_recent(storage, name)
+        ):
+            return
+        for path in [name, *all_variant_names(name)]:
+            storage.delete(path)
+    transaction.on_commit(release)
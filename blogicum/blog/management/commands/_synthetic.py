@@ -0,0 +1,107 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post
+from blog.search import rebuild_index
+from blog.service import recount_comments
+
+User = get_user_model()
+
+WORDS = (
+    'пост', 'город', 'утро', 'поезд', 'кофе', 'море', 'книга', 'дорога',
+    'ветер', 'осень', 'музей', 'рынок', 'парк', 'мост', 'вечер', 'гора',
+)
+
+
+@contextmanager
+def temporary_database(path=None):
+    """Point the default connection at a fresh, migrated database.
+
+    Without ``path`` SQLite keeps the database in memory.
+    """
+    connection = connections[DEFAULT_DB_ALIAS]
+    if path:
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = str(path)
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def _text(rnd, n_words):
+    return ' '.join(rnd.choice(WORDS) for _ in range(n_words))
+
+
+def seed_dataset(n_posts, comments_per_post=0, batch_size=10000, seed=0):
+    """Bulk-insert a synthetic blog of ``n_posts`` posts.
+
+    Users, categories and locations scale with the number of posts.
+    About 5% of posts and 10% of categories are unpublished, and 2% of
+    posts are scheduled in the future.
+    """
+    rnd = random.Random(seed)
+    now = timezone.now()
+    User.objects.bulk_create(
+        User(username=f'user{i}', password='!')
+        for i in range(max(10, n_posts // 100))
+    )
+    Category.objects.bulk_create(
+        Category(
+            title=f'Категория {i}', description=_text(rnd, 10),
+            slug=f'category-{i}', is_published=i % 10 != 0
+        )
+        for i in range(max(10, n_posts // 1000))
+    )
+    Location.objects.bulk_create(
+        Location(name=f'Место {i}') for i in range(max(10, n_posts // 1000))
+    )
+    # SQLite does not return primary keys from bulk_create.
+    users = list(User.objects.values_list('id', flat=True))
+    categories = list(Category.objects.values_list('id', flat=True))
+    locations = list(Location.objects.values_list('id', flat=True))
+    for start in range(0, n_posts, batch_size):
+        Post.objects.bulk_create(
+            Post(
+                title=_text(rnd, 3),
+                text=_text(rnd, 40),
+                pub_date=now + timedelta(
+                    minutes=rnd.randint(1, 60 * 24 * 30)
+                    if rnd.random() < 0.02
+                    else -rnd.randint(1, 60 * 24 * 365 * 5)
+                ),
+                author_id=rnd.choice(users),
+                category_id=rnd.choice(categories),
+                location_id=rnd.choice(locations),
+                is_published=rnd.random() >= 0.05,
+            )
+            for _ in range(start, min(start + batch_size, n_posts))
+        )
+    if comments_per_post:
+        n_comments = n_posts * comments_per_post
+        post_ids = list(Post.objects.values_list('id', flat=True))
+        for start in range(0, n_comments, batch_size):
+            Comment.objects.bulk_create(
+                Comment(
+                    text=_text(rnd, 12),
+                    author_id=rnd.choice(users),
+                    post_id=rnd.choice(post_ids),
+                )
+                for _ in range(start, min(start + batch_size, n_comments))
+            )
+        recount_comments()
+    rebuild_index(Post.objects.all(), batch_size)
+    return {
+        'posts': n_posts,
+        'comments': n_posts * comments_per_post,
+        'users': len(users),
+        'categories': len(categories),
+        'locations': len(locations),
+    }
@@ -0,0 +1,101 @@
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections
+from django.test import Client, override_settings
+
+from blog.models import User
+from blog.service import get_posts_query_set
+
+from ._synthetic import seed_dataset, temporary_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет пропускную способность ленты и комментариев при '
+        'одновременных чтении и записи в файловую БД.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=10)
+        parser.add_argument(
+            '--no-pragmas', action='store_true',
+            help='Сравнить с журналом и синхронизацией SQLite по умолчанию.'
+        )
+
+    def handle(self, *args, posts, readers, writers, duration, no_pragmas,
+               **options):
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(
+                **({'SQLITE_PRAGMAS': {}} if no_pragmas else {})
+            ), temporary_database(Path(directory) / 'bench.sqlite3'):
+                self.stdout.write(f'Заполнение: {seed_dataset(posts)}')
+                post_ids = list(
+                    get_posts_query_set().values_list('id', flat=True)[:500]
+                )
+                user = User.objects.first()
+                connections.close_all()
+                self.run(post_ids, user, readers, writers, duration)
+
+    def run(self, post_ids, user, readers, writers, duration):
+        results = {'read': [], 'write': []}
+        deadline = time.perf_counter() + duration
+        threads = [
+            threading.Thread(
+                target=self.worker,
+                args=(kind, seed, post_ids, user, deadline, results[kind])
+            )
+            for seed, kind in enumerate(
+                ['read'] * readers + ['write'] * writers
+            )
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for kind, counts in results.items():
+            done = sum(count for count, _ in counts)
+            errors = sum(error for _, error in counts)
+            self.stdout.write(
+                f'{kind}: {done / duration:.1f} запросов/с, '
+                f'ошибок {errors}'
+            )
+
+    def worker(self, kind, seed, post_ids, user, deadline, results):
+        rnd = random.Random(seed)
+        client = Client(SERVER_NAME='127.0.0.1')
+        if kind == 'write':
+            client.force_login(user)
+        done = errors = 0
+        try:
+            while time.perf_counter() < deadline:
+                try:
+                    response = self.request(client, kind, rnd, post_ids)
+                except OperationalError:
+                    errors += 1
+                    continue
+                if response.status_code >= 400:
+                    errors += 1
+                else:
+                    done += 1
+        finally:
+            connections.close_all()
+        results.append((done, errors))
+
+    def request(self, client, kind, rnd, post_ids):
+        post_id = rnd.choice(post_ids)
+        if kind == 'write':
+            return client.post(
+                f'/posts/{post_id}/comment/',
+                {'text': 'Нагрузочный комментарий'}
+            )
+        if rnd.random() < 0.5:
+            return client.get('/')
+        return client.get(f'/posts/{post_id}/')
@@ -0,0 +1,67 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.constants import NUMBER_OF_POSTS_ON_PAGE
+from blog.models import Category, Post, User
+from blog.service import get_posts_query_set
+
+from ._synthetic import seed_dataset, temporary_database
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает планы и время запросов лент публикаций без индексов '
+        'Post.Meta.indexes и с ними на синтетических данных.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1000000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument(
+            '--db-path',
+            help='Файл временной БД; по умолчанию SQLite в памяти.'
+        )
+
+    def handle(self, *args, posts, repeat, db_path, **options):
+        with temporary_database(db_path) as connection:
+            self.stdout.write(f'Заполнение: {seed_dataset(posts)}')
+            author = User.objects.order_by('?').first()
+            category = Category.objects.filter(is_published=True).first()
+            queries = {
+                'index': lambda: get_posts_query_set(),
+                'category_posts': lambda: get_posts_query_set().filter(
+                    category=category
+                ),
+                'profile (чужой)': lambda: get_posts_query_set().filter(
+                    author=author
+                ),
+                'profile (свой)': lambda: get_posts_query_set(owner=author),
+            }
+            indexes = Post._meta.indexes
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.remove_index(Post, index)
+            self.report('Без индексов', queries, repeat, connection)
+            with connection.schema_editor() as editor:
+                for index in indexes:
+                    editor.add_index(Post, index)
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            self.report('С индексами', queries, repeat, connection)
+
+    def report(self, title, queries, repeat, connection):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        for name, build in queries.items():
+            page = build()[:NUMBER_OF_POSTS_ON_PAGE]
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(build()[:NUMBER_OF_POSTS_ON_PAGE])
+                timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(
+                f'{name}: медиана {statistics.median(timings):.2f} мс, '
+                f'максимум {max(timings):.2f} мс'
+            )
+            self.stdout.write(page.explain())
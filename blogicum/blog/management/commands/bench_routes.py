@@ -0,0 +1,216 @@
+import json
+import platform
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from socketserver import ThreadingMixIn
+from urllib.error import HTTPError
+from urllib.request import HTTPRedirectHandler, Request, build_opener
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import django
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.shortcuts import resolve_url
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog import urls as blog_urls
+from blog.models import Comment
+from blog.service import create_comment, get_posts_query_set
+from pages import urls as pages_urls
+
+from ._synthetic import seed_dataset, temporary_database
+
+ROUTE_MODULES = (blog_urls, pages_urls)
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def summarize(latencies, wall_time, queries=None):
+    """Latency percentiles in milliseconds and requests per second."""
+    cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+    summary = {
+        'requests': len(latencies),
+        'p50_ms': round(cuts[49] * 1000, 3),
+        'p95_ms': round(cuts[94] * 1000, 3),
+        'p99_ms': round(cuts[98] * 1000, 3),
+        'throughput_rps': round(len(latencies) / wall_time, 1),
+    }
+    if queries is not None:
+        summary['queries_per_request'] = round(
+            statistics.mean(queries), 2
+        )
+    return summary
+
+
+def route_urls(values):
+    """Yield ``(route name, url)`` for every route of the blog and pages."""
+    for module in ROUTE_MODULES:
+        for pattern in module.urlpatterns:
+            converters = pattern.pattern.converters
+            if any(name not in values for name in converters):
+                continue
+            name = f'{module.app_name}:{pattern.name}'
+            yield name, reverse(
+                name, kwargs={key: values[key] for key in converters}
+            )
+
+
+def sample_values():
+    post = get_posts_query_set().filter(category__isnull=False).first()
+    comment = Comment(text='Комментарий автора', author=post.author)
+    comment.post = post
+    create_comment(comment)
+    values = {
+        'post_id': post.id,
+        'comment_id': comment.id,
+        'category': post.category.slug,
+        'username': post.author.username,
+    }
+    return values, post.author
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            cwd=settings.BASE_DIR, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест всех адресов blog и pages на синтетических '
+        'данных: задержки p50/p95/p99, пропускная способность и число '
+        'запросов к БД в формате JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[10000],
+            help='Размеры наборов данных, например 10000 100000 1000000.'
+        )
+        parser.add_argument('--comments-per-post', type=int, default=5)
+        parser.add_argument(
+            '--requests', type=int, default=50,
+            help='Запросов на адрес в каждом режиме.'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=4,
+            help='Параллельных клиентов для WSGI-сервера.'
+        )
+        parser.add_argument('--output', help='Файл для отчёта JSON.')
+
+    def handle(self, *args, sizes, comments_per_post, requests, concurrency,
+               output, **options):
+        report = {
+            'commit': current_commit(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'requests_per_route': requests,
+            'concurrency': concurrency,
+            'datasets': {},
+        }
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as directory:
+                with temporary_database(Path(directory) / 'bench.sqlite3'):
+                    dataset = seed_dataset(size, comments_per_post)
+                    report['datasets'][str(size)] = {
+                        'dataset': dataset,
+                        'routes': self.bench_dataset(requests, concurrency),
+                    }
+                    connections.close_all()
+        content = json.dumps(report, ensure_ascii=False, indent=2)
+        if output:
+            Path(output).write_text(content, encoding='utf-8')
+        else:
+            self.stdout.write(content)
+
+    def bench_dataset(self, requests, concurrency):
+        values, author = sample_values()
+        anonymous = Client(SERVER_NAME='127.0.0.1')
+        logged_in = Client(SERVER_NAME='127.0.0.1')
+        logged_in.force_login(author)
+        server = make_server(
+            '127.0.0.1', 0, WSGIHandler(),
+            server_class=ThreadingWSGIServer, handler_class=QuietHandler
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_port}'
+        results = {}
+        try:
+            for name, url in route_urls(values):
+                # Routes that send anonymous users to log in are measured
+                # for the author of the sample post.
+                probe = anonymous.get(url)
+                client = logged_in if probe.status_code == 302 and (
+                    probe.url.startswith(resolve_url(settings.LOGIN_URL))
+                ) else anonymous
+                cookies = '; '.join(
+                    f'{key}={morsel.value}'
+                    for key, morsel in client.cookies.items()
+                )
+                results[name] = {
+                    'url': url,
+                    'user': 'author' if client is logged_in else 'anonymous',
+                    'status': client.get(url).status_code,
+                    'test_client': self.bench_client(client, url, requests),
+                    'wsgi': self.bench_wsgi(
+                        base_url + url, cookies, requests, concurrency
+                    ),
+                }
+        finally:
+            server.shutdown()
+            server.server_close()
+        return results
+
+    def bench_client(self, client, url, requests):
+        latencies, queries = [], []
+        started = time.perf_counter()
+        for _ in range(requests):
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                client.get(url)
+                latencies.append(time.perf_counter() - start)
+            queries.append(len(captured))
+        return summarize(latencies, time.perf_counter() - started, queries)
+
+    def bench_wsgi(self, url, cookies, requests, concurrency):
+        opener = build_opener(NoRedirect)
+
+        def fetch(_):
+            request = Request(url, headers={'Cookie': cookies})
+            start = time.perf_counter()
+            try:
+                with opener.open(request) as response:
+                    response.read()
+            except HTTPError as error:
+                error.read()
+            return time.perf_counter() - start
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            latencies = list(pool.map(fetch, range(requests)))
+        return summarize(latencies, time.perf_counter() - started)
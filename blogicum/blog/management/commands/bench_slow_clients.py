@@ -0,0 +1,141 @@
+import asyncio
+import json
+import socket
+import time
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from .bench_routes import current_commit, summarize
+
+
+async def slow_request(host, port, path, send_delay, read_size, read_delay):
+    """Send ``path`` a header line at a time and read the answer slowly.
+
+    A small receive buffer keeps the server writing for as long as the
+    client takes to read. Returns the status code.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, read_size)
+    sock.setblocking(False)
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.sock_connect(sock, (host, port))
+    except OSError:
+        sock.close()
+        raise
+    reader, writer = await asyncio.open_connection(sock=sock)
+    try:
+        lines = (
+            f'GET {path} HTTP/1.1', f'Host: {host}:{port}',
+            'Connection: close', '', ''
+        )
+        for line in lines:
+            writer.write(f'{line}\r\n'.encode())
+            await writer.drain()
+            await asyncio.sleep(send_delay)
+        status_line = await reader.readline()
+        while await reader.read(read_size):
+            await asyncio.sleep(read_delay)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return int(status_line.split()[1])
+
+
+async def run_clients(url, paths, clients, duration, send_delay, read_size,
+                      read_delay):
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    prefix = parts.path.rstrip('/')
+    latencies, statuses = [], Counter()
+    deadline = time.perf_counter() + duration
+
+    async def client(number):
+        index = number
+        while time.perf_counter() < deadline:
+            path = prefix + paths[index % len(paths)]
+            index += 1
+            start = time.perf_counter()
+            try:
+                status = await slow_request(
+                    host, port, path, send_delay, read_size, read_delay
+                )
+            except (OSError, IndexError, ValueError):
+                statuses['error'] += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            statuses[str(status)] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(number) for number in range(clients)))
+    wall_time = time.perf_counter() - started
+    if len(latencies) < 2:
+        return {'statuses': dict(statuses)}
+    return {**summarize(latencies, wall_time), 'statuses': dict(statuses)}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнение запущенных WSGI- и ASGI-серверов под нагрузкой медленных '
+        'клиентов: запросов в секунду и задержки p50/p95/p99 в формате JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--wsgi-url', help='Адрес WSGI-сервера, например '
+            'http://127.0.0.1:8001.'
+        )
+        parser.add_argument('--asgi-url', help='Адрес ASGI-сервера.')
+        parser.add_argument(
+            '--paths', nargs='+', default=['/'],
+            help='Пути, которые клиенты запрашивают по очереди.'
+        )
+        parser.add_argument(
+            '--clients', type=int, default=200,
+            help='Одновременных клиентов.'
+        )
+        parser.add_argument(
+            '--duration', type=float, default=30,
+            help='Длительность нагрузки на каждый сервер, секунд.'
+        )
+        parser.add_argument(
+            '--send-delay', type=float, default=0.05,
+            help='Пауза между строками запроса, секунд.'
+        )
+        parser.add_argument(
+            '--read-size', type=int, default=4096,
+            help='Размер буфера приёма и порции чтения ответа, байт.'
+        )
+        parser.add_argument(
+            '--read-delay', type=float, default=0.01,
+            help='Пауза между порциями чтения ответа, секунд.'
+        )
+        parser.add_argument('--output', help='Файл для отчёта JSON.')
+
+    def handle(self, *args, wsgi_url, asgi_url, paths, output, **options):
+        servers = {
+            name: url
+            for name, url in (('wsgi', wsgi_url), ('asgi', asgi_url)) if url
+        }
+        if not servers:
+            raise CommandError('Укажите --wsgi-url и/или --asgi-url.')
+        load = {
+            key: options[key] for key in (
+                'clients', 'duration', 'send_delay', 'read_size',
+                'read_delay'
+            )
+        }
+        report = {'commit': current_commit(), 'paths': paths, **load}
+        for name, url in servers.items():
+            report[name] = {
+                'url': url,
+                **asyncio.run(run_clients(url, paths, **load)),
+            }
+        content = json.dumps(report, ensure_ascii=False, indent=2)
+        if output:
+            Path(output).write_text(content, encoding='utf-8')
+        else:
+            self.stdout.write(content)
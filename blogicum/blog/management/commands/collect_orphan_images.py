@@ -0,0 +1,54 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.images import all_variant_names, is_recent
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет из хранилища изображения и их копии, на которые '
+        'не ссылается ни одна публикация.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true')
+        parser.add_argument(
+            '--min-age', type=int, default=settings.ORPHAN_IMAGE_MIN_AGE,
+            help=(
+                'Не трогать файлы моложе стольких секунд: их публикация '
+                'может быть ещё не сохранена.'
+            )
+        )
+
+    def handle(self, *args, dry_run, min_age, **options):
+        field = Post._meta.get_field('image')
+        storage = field.storage
+        referenced = set(
+            Post.objects.exclude(image='').exclude(
+                image__isnull=True
+            ).values_list('image', flat=True)
+        )
+        for name in list(referenced):
+            referenced.update(all_variant_names(name))
+        removed = 0
+        for name in self.walk(storage, field.upload_to):
+            if name not in referenced and not is_recent(
+                storage, name, min_age
+            ):
+                removed += 1
+                self.stdout.write(name)
+                if not dry_run:
+                    storage.delete(name)
+        self.stdout.write(
+            self.style.SUCCESS(f'Неиспользуемых файлов: {removed}')
+        )
+
+    def walk(self, storage, directory):
+        if not storage.exists(directory):
+            return
+        subdirectories, files = storage.listdir(directory)
+        for name in files:
+            yield f'{directory}/{name}'
+        for subdirectory in subdirectories:
+            yield from self.walk(storage, f'{directory}/{subdirectory}')
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import GLOBAL_SCOPE, bump_listings, invalidate_post_cards
+from blog.images import generate_variants
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии изображений уже загруженных постов.'
+
+    def handle(self, *args, **options):
+        posts = dict(
+            Post.objects.exclude(image='').exclude(
+                image__isnull=True
+            ).values_list('id', 'image')
+        )
+        storage = Post._meta.get_field('image').storage
+        for name in set(posts.values()):
+            generate_variants(storage, name)
+            self.stdout.write(name)
+        invalidate_post_cards(posts)
+        bump_listings([GLOBAL_SCOPE])
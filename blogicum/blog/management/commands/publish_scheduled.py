@@ -0,0 +1,62 @@
+import time
+from datetime import datetime
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from blog.scheduler import next_publication, publish_due
+
+LAST_RUN_KEY = 'publish_scheduled:last_run'
+# Backends the web workers cannot see the command's writes through.
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+class Command(BaseCommand):
+    help = (
+        'Следит за отложенными публикациями: в момент наступления pub_date '
+        'отправляет сигнал post_became_visible, который сбрасывает и '
+        'прогревает кеш ленты, категории и профиля. Кеш должен быть общим '
+        'с веб-сервером (CACHE_BACKEND, например Redis или Memcached): '
+        'LocMemCache живёт только внутри одного процесса.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать наступившие публикации и завершиться.'
+        )
+        parser.add_argument(
+            '--since', type=datetime.fromisoformat,
+            help='Начало интервала; по умолчанию время прошлого запуска.'
+        )
+        parser.add_argument(
+            '--max-sleep', type=float, default=60,
+            help='Как часто проверять новые отложенные публикации, секунд.'
+        )
+
+    def handle(self, *args, once, since, max_sleep, **options):
+        if isinstance(caches[DEFAULT_CACHE_ALIAS], PROCESS_LOCAL_CACHES):
+            raise CommandError(
+                'Кеш доступен только этому процессу: сброс и прогрев не '
+                'дойдут до веб-сервера. Укажите общий CACHE_BACKEND.'
+            )
+        if since and timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        last_run = since or cache.get(LAST_RUN_KEY) or timezone.now()
+        while True:
+            now = timezone.now()
+            published = publish_due(last_run, now)
+            if published:
+                self.stdout.write(f'Опубликовано по расписанию: {published}')
+            last_run = now
+            cache.set(LAST_RUN_KEY, last_run, timeout=None)
+            if once:
+                return
+            pending = next_publication(now)
+            delay = max_sleep
+            if pending is not None:
+                delay = min(delay, (pending - now).total_seconds())
+            time.sleep(max(delay, 0))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max
+
+from blog.models import Post
+from blog.service import recount_comments
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count по таблице комментариев.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Сколько публикаций обновлять одним запросом.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        last_id = Post.objects.aggregate(last=Max('id'))['last'] or 0
+        updated = 0
+        for start in range(0, last_id, batch_size):
+            updated += recount_comments(Post.objects.filter(
+                id__gt=start, id__lte=start + batch_size
+            ))
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано публикаций: {updated}')
+        )
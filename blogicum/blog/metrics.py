@@ -0,0 +1,356 @@
+import hmac
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.template import base as template_base
+from django.template.backends.django import Template
+from django.template.loader_tags import IncludeNode
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w"])-?\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s')
+_SPACES = re.compile(r'\s+')
+_IN_LIST = re.compile(r'\bIN \(\?(?:, ?\?)*\)', re.I)
+
+current_request = ContextVar('request_metrics', default=None)
+
+
+def normalize_sql(sql):
+    """Reduce ``sql`` to its shape: literals and IN lists become ``?``."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _SPACES.sub(' ', sql).strip()
+    return _IN_LIST.sub('IN (...)', sql)
+
+
+def repeated_queries(statements, threshold):
+    """Return ``{shape: count}`` for statement shapes run ``threshold``+ times.
+
+    One shape executed once per row of a page is the signature of N+1.
+    """
+    shapes = Counter()
+    for sql, count in Counter(statements).items():
+        shapes[normalize_sql(sql)] += count
+    return {
+        shape: count for shape, count in shapes.items() if count >= threshold
+    }
+
+
+class RequestMetrics:
+    def __init__(self, profile_templates=False):
+        self.statements = []
+        self.db_time = 0.0
+        self.template_time = 0.0
+        # {(kind, template, node): [renders, seconds]}, kept only under
+        # TEMPLATE_PROFILING.
+        self.fragments = (
+            defaultdict(lambda: [0, 0.0]) if profile_templates else None
+        )
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.statements.append(sql)
+
+    def add_fragment(self, key, seconds):
+        totals = self.fragments[key]
+        totals[0] += 1
+        totals[1] += seconds
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper reporting to the metrics of the current request."""
+    metrics = current_request.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def instrument_connection(connection):
+    # Connections are per thread, so the wrapper follows the request into
+    # whichever thread runs its queries, including async view offloads.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class MetricsRegistry:
+    """Per-process totals by view name, rendered in Prometheus text format.
+
+    Every worker process keeps its own totals; Prometheus sums them when
+    each worker is scraped.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.views = defaultdict(lambda: {
+            'requests': 0, 'queries': 0, 'duplicates': 0, 'db': 0.0,
+            'template': 0.0, 'duration': 0.0,
+            'buckets': [0] * len(LATENCY_BUCKETS),
+        })
+        self.fragments = defaultdict(lambda: [0, 0.0])
+
+    def observe(self, view, duration, metrics, duplicates):
+        with self.lock:
+            totals = self.views[view]
+            totals['requests'] += 1
+            totals['queries'] += len(metrics.statements)
+            totals['duplicates'] += bool(duplicates)
+            totals['db'] += metrics.db_time
+            totals['template'] += metrics.template_time
+            totals['duration'] += duration
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if duration <= bound:
+                    totals['buckets'][index] += 1
+            for key, (renders, seconds) in (metrics.fragments or {}).items():
+                self.fragments[key][0] += renders
+                self.fragments[key][1] += seconds
+
+    def render(self):
+        with self.lock:
+            views = {
+                view: {**totals, 'buckets': list(totals['buckets'])}
+                for view, totals in self.views.items()
+            }
+            fragments = {
+                key: list(totals) for key, totals in self.fragments.items()
+            }
+        lines = []
+        counters = (
+            ('requests', 'blogicum_requests_total', 'Requests.'),
+            ('queries', 'blogicum_db_queries_total', 'SQL queries.'),
+            ('db', 'blogicum_db_seconds_total', 'Time in SQL queries.'),
+            ('template', 'blogicum_template_seconds_total',
+             'Time rendering templates.'),
+            ('duplicates', 'blogicum_duplicate_query_requests_total',
+             'Requests that repeated one SQL statement shape.'),
+        )
+        for key, name, help_text in counters:
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+            lines += [
+                f'{name}{{view="{view}"}} {totals[key]}'
+                for view, totals in views.items()
+            ]
+        name = 'blogicum_request_duration_seconds'
+        lines += [
+            f'# HELP {name} Request latency.', f'# TYPE {name} histogram'
+        ]
+        for view, totals in views.items():
+            for bound, count in zip(LATENCY_BUCKETS, totals['buckets']):
+                lines.append(
+                    f'{name}_bucket{{view="{view}",le="{bound}"}} {count}'
+                )
+            lines += [
+                f'{name}_bucket{{view="{view}",le="+Inf"}} '
+                f'{totals["requests"]}',
+                f'{name}_sum{{view="{view}"}} {totals["duration"]}',
+                f'{name}_count{{view="{view}"}} {totals["requests"]}',
+            ]
+        families = (
+            ('template', 'Renders of each template, nested renders included.'),
+            ('include', 'Include tags by the template and line they are on.'),
+        )
+        for kind, help_text in families:
+            labels = {
+                key: f'template="{key[1]}"' + (
+                    f',node="{key[2]}"' if key[2] else ''
+                )
+                for key in fragments if key[0] == kind
+            }
+            if not labels:
+                continue
+            for index, metric in enumerate(
+                ('renders_total', 'render_seconds_total')
+            ):
+                name = f'blogicum_{kind}_{metric}'
+                lines += [
+                    f'# HELP {name} {help_text}', f'# TYPE {name} counter'
+                ]
+                lines += [
+                    f'{name}{{{label}}} {fragments[key][index]}'
+                    for key, label in labels.items()
+                ]
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def _timed_render(render):
+    def wrapper(self, *args, **kwargs):
+        metrics = current_request.get()
+        if metrics is None:
+            return render(self, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            metrics.template_time += time.perf_counter() - start
+    wrapper.timed = True
+    return wrapper
+
+
+def _profiled_render(render, label):
+    def wrapper(self, context):
+        metrics = current_request.get()
+        if metrics is None or metrics.fragments is None:
+            return render(self, context)
+        start = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            metrics.add_fragment(label(self), time.perf_counter() - start)
+    wrapper.timed = True
+    return wrapper
+
+
+def _template_label(template):
+    return 'template', template.origin.template_name or template.name, ''
+
+
+def _include_label(node):
+    return (
+        'include', node.template.token.strip('\'"'),
+        f'{node.origin.template_name}:{node.token.lineno}'
+    )
+
+
+def instrument_templates():
+    """Time top-level renders of Django templates for the current request.
+
+    With TEMPLATE_PROFILING every template, whether extended, included or
+    rendered directly, and every include tag is timed as well.
+    """
+    if not getattr(Template.render, 'timed', False):
+        Template.render = _timed_render(Template.render)
+    if not settings.TEMPLATE_PROFILING:
+        return
+    if not getattr(template_base.Template._render, 'timed', False):
+        template_base.Template._render = _profiled_render(
+            template_base.Template._render, _template_label
+        )
+    if not getattr(IncludeNode.render, 'timed', False):
+        IncludeNode.render = _profiled_render(
+            IncludeNode.render, _include_label
+        )
+
+
+class MetricsMiddleware:
+    """Record query count, DB, template and total time per view name.
+
+    Statement shapes repeated METRICS_DUPLICATE_THRESHOLD times in one
+    request are logged as likely N+1 queries.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            # Lets Django await this middleware, as MiddlewareMixin does.
+            markcoroutinefunction(self)
+        instrument_templates()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics = RequestMetrics(settings.TEMPLATE_PROFILING)
+        token = current_request.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        self.observe(request, response, metrics, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics(settings.TEMPLATE_PROFILING)
+        token = current_request.set(metrics)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+        self.observe(request, response, metrics, time.perf_counter() - start)
+        return response
+
+    def observe(self, request, response, metrics, duration):
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        duplicates = repeated_queries(
+            metrics.statements, settings.METRICS_DUPLICATE_THRESHOLD
+        )
+        registry.observe(view, duration, metrics, duplicates)
+        record = {
+            'view': view,
+            'method': request.method,
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 2),
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'template_ms': round(metrics.template_time * 1000, 2),
+            'queries': len(metrics.statements),
+        }
+        if metrics.fragments:
+            record['templates'] = {
+                f'{node} {template}' if node else template:
+                    round(seconds * 1000, 2)
+                for (_, template, node), (_, seconds)
+                in metrics.fragments.items()
+            }
+        logger.info('request', extra={'metrics': record})
+        if duplicates:
+            logger.warning('repeated queries', extra={'metrics': {
+                **record, 'repeated': duplicates,
+            }})
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        return json.dumps({
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **getattr(record, 'metrics', {}),
+        }, ensure_ascii=False)
+
+
+def metrics_view(request):
+    """Serve the registry to staff users and to scrapers with METRICS_TOKEN.
+
+    REMOTE_ADDR is not trusted: behind the reverse proxy every request
+    comes from 127.0.0.1.
+    """
+    scheme, _, token = request.META.get('HTTP_AUTHORIZATION', '').partition(
+        ' '
+    )
+    authorized = bool(settings.METRICS_TOKEN) and scheme == 'Bearer' and (
+        # compare_digest() only takes ASCII str, so compare the bytes.
+        hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode())
+    )
+    if not (authorized or request.user.is_staff):
+        raise Http404
+    return HttpResponse(
+        registry.render(), content_type='text/plain; version=0.0.4'
+    )
@@ -0,0 +1,73 @@
+import time
+
+from asgiref.sync import (
+    iscoroutinefunction, markcoroutinefunction, sync_to_async
+)
+from django.conf import settings
+
+from .routers import read_database
+
+PINNED_UNTIL_KEY = 'read_primary_until'
+SAFE_METHODS = ('GET', 'HEAD')
+
+
+class ReplicaRoutingMiddleware:
+    """Serve REPLICA_VIEWS from REPLICA_DATABASE.
+
+    A session that has just written reads from the primary for
+    REPLICA_STICKY_SECONDS, so authors see their own changes despite
+    replication lag.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = read_database.set(read_database.get())
+        try:
+            response = self.get_response(request)
+        finally:
+            read_database.reset(token)
+        if self.wrote(request, response):
+            self.pin_to_primary(request)
+        return response
+
+    async def __acall__(self, request):
+        token = read_database.set(read_database.get())
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_database.reset(token)
+        if self.wrote(request, response):
+            # Writing to the session may load it from the database.
+            await sync_to_async(self.pin_to_primary)(request)
+        return response
+
+    def wrote(self, request, response):
+        return (
+            settings.REPLICA_DATABASE
+            and request.method not in SAFE_METHODS
+            and response.status_code < 400
+        )
+
+    def pin_to_primary(self, request):
+        request.session[PINNED_UNTIL_KEY] = (
+            time.time() + settings.REPLICA_STICKY_SECONDS
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            settings.REPLICA_DATABASE
+            and request.method in SAFE_METHODS
+            and request.resolver_match.view_name in settings.REPLICA_VIEWS
+            and request.session.get(PINNED_UNTIL_KEY, 0) < time.time()
+        ):
+            read_database.set(settings.REPLICA_DATABASE)
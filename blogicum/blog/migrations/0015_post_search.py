@@ -0,0 +1,86 @@
+import re
+
+from django.db import migrations
+
+try:
+    import snowballstemmer
+except ImportError:
+    snowballstemmer = None
+
+# Copied from blog.search as of this migration, so that later changes to
+# the application code do not rewrite history.
+SEARCH_TABLE = 'blog_post_search'
+PG_DOCUMENT = (
+    "to_tsvector('russian', blog_post.title || ' ' || blog_post.text)"
+)
+CREATE_FTS_TABLE = (
+    f'CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5('
+    "title, text, tokenize = 'unicode61 remove_diacritics 2')"
+)
+INSERT_ROW = (
+    f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) VALUES (%s, %s, %s)'
+)
+CREATE_GIN_INDEX = (
+    f'CREATE INDEX {SEARCH_TABLE}_idx ON blog_post '
+    f'USING GIN (({PG_DOCUMENT}))'
+)
+WORD = re.compile(r'\w+')
+BATCH_SIZE = 1000
+
+
+def make_normalizer():
+    if snowballstemmer is not None:
+        stem = snowballstemmer.stemmer('russian').stemWord
+    else:
+        def stem(word):
+            return word
+
+    def normalize(text):
+        words = WORD.findall(text.lower().replace('ё', 'е'))
+        return ' '.join(stem(word) for word in words)
+    return normalize
+
+
+def fill_search_table(apps, schema_editor):
+    normalize = make_normalizer()
+    Post = apps.get_model('blog', 'Post')
+    rows = Post.objects.using(schema_editor.connection.alias).values_list(
+        'pk', 'title', 'text'
+    ).order_by('pk')
+    with schema_editor.connection.cursor() as cursor:
+        batch = []
+        for pk, title, text in rows.iterator(chunk_size=BATCH_SIZE):
+            batch.append((pk, normalize(title), normalize(text)))
+            if len(batch) == BATCH_SIZE:
+                cursor.executemany(INSERT_ROW, batch)
+                batch = []
+        if batch:
+            cursor.executemany(INSERT_ROW, batch)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(CREATE_FTS_TABLE)
+        fill_search_table(apps, schema_editor)
+    elif vendor == 'postgresql':
+        schema_editor.execute(CREATE_GIN_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE {SEARCH_TABLE}')
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX {SEARCH_TABLE}_idx')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -77,16 +77,44 @@ class Post(PublishedCreatedModel):
         verbose_name='Категория'
     )
     image = models.ImageField(null=True, upload_to='post_image', blank=True)
+    comment_count = models.PositiveIntegerField(
+        default=0, editable=False, verbose_name='Количество комментариев'
+    )
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Изменено')
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date', )
         default_related_name = 'posts'
+        indexes = (
+            models.Index(
+                fields=('is_published', '-pub_date'),
+                name='post_published_feed_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'), name='post_author_feed_idx'
+            ),
+            models.Index(
+                fields=('category', 'is_published', '-pub_date'),
+                name='post_category_feed_idx'
+            ),
+            models.Index(fields=('pub_date',), name='post_pub_date_idx'),
+        )
 
     def __str__(self):
         return self.title[:PREVIEW_LIMIT]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_listing_ids = (
+            instance.__dict__.get('category_id'),
+            instance.__dict__.get('author_id'),
+        )
+        instance._loaded_image = instance.__dict__.get('image')
+        return instance
+
 
 class Comment(PublishedCreatedModel):
 
@@ -114,3 +142,36 @@ class Comment(PublishedCreatedModel):
         result_string = (f'Комментарий пользователя {self.author.username} '
                          f'для поста {self.post.title[:PREVIEW_LIMIT]}')
         return result_string
+
+
+class FullTextField(models.TextField):
+    """A column of an SQLite FTS5 table, queried with ``__match``."""
+
+
+@FullTextField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        # FTS5 only accepts MATCH against the table itself, by its alias.
+        table = compiler.quote_name_unless_alias(self.lhs.alias)
+        rhs, params = self.process_rhs(compiler, connection)
+        return f'{table} MATCH {rhs}', params
+
+
+class PostSearch(models.Model):
+    """Stemmed title and text of a post in the SQLite FTS5 index.
+
+    Migration 0015 creates the table and blog.search keeps it in sync.
+    """
+
+    post = models.OneToOneField(
+        Post, on_delete=models.DO_NOTHING, primary_key=True,
+        db_column='rowid', related_name='search_document'
+    )
+    title = FullTextField()
+    text = FullTextField()
+
+    class Meta:
+        managed = False
+        db_table = 'blog_post_search'
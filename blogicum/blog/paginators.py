@@ -0,0 +1,182 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+# Below this many rows an exact COUNT(*) is cheap enough.
+ESTIMATED_COUNT_THRESHOLD = 10000
+# JSON types encode_cursor() writes for the ordering fields.
+CURSOR_TYPES = (str, int, float)
+
+
+class CursorPage:
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset pagination: no COUNT(*) and no OFFSET scan.
+
+    ``ordering`` must end with a unique field so that the key is total.
+    """
+
+    def __init__(self, object_list, per_page, ordering=('-pub_date', '-id')):
+        self.object_list = object_list
+        self.per_page = per_page
+        self.ordering = ordering
+        self.fields = [name.lstrip('-') for name in ordering]
+
+    def encode_cursor(self, instance, backwards=False):
+        values = [getattr(instance, name) for name in self.fields]
+        values = [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in values
+        ]
+        payload = json.dumps([values, backwards])
+        return urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values, backwards = json.loads(urlsafe_b64decode(padded))
+            if not isinstance(backwards, bool) or len(values) != len(
+                self.fields
+            ):
+                raise ValueError('Cursor does not match the ordering.')
+            # Keys are non-null scalars; None would reach the filter.
+            if not all(type(value) in CURSOR_TYPES for value in values):
+                raise ValueError('Cursor holds a value of the wrong type.')
+            model = self.object_list.model
+            values = [
+                model._meta.get_field(name).to_python(value)
+                for name, value in zip(self.fields, values)
+            ]
+        except (BinasciiError, TypeError, ValueError, ValidationError):
+            return None, False
+        return values, bool(backwards)
+
+    def _after(self, values, backwards):
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.ordering, values):
+            field = name.lstrip('-')
+            descending = name.startswith('-') != backwards
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def get_page(self, cursor=None):
+        values, backwards = (
+            self.decode_cursor(cursor) if cursor else (None, False)
+        )
+        ordering = self.ordering
+        if backwards:
+            ordering = [
+                name[1:] if name.startswith('-') else f'-{name}'
+                for name in ordering
+            ]
+        queryset = self.object_list.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self._after(values, backwards))
+        items = list(queryset[:self.per_page + 1])
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if backwards:
+            items.reverse()
+        if not items:
+            return CursorPage(items)
+        next_cursor = previous_cursor = None
+        if has_more or backwards:
+            next_cursor = self.encode_cursor(items[-1])
+        if values is not None and (has_more or not backwards):
+            previous_cursor = self.encode_cursor(items[0], backwards=True)
+        return CursorPage(items, next_cursor, previous_cursor)
+
+
+def estimate_count(model, using):
+    """Estimate the row count of the whole table of ``model``.
+
+    Reads the planner statistics of the last ANALYZE, so rows inserted or
+    deleted since then are not reflected. Returns None without statistics.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+                [table]
+            )
+            row = cursor.fetchone()
+            count = row[0] if row else None
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'"
+            )
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1',
+                [table]
+            )
+            row = cursor.fetchone()
+            # The first number of a stat row is the row count of the table.
+            count = int(row[0].split()[0]) if row else None
+        else:
+            return None
+    return count if count and count > 0 else None
+
+
+def is_whole_table(queryset):
+    query = queryset.query
+    return not (
+        query.has_filters() or query.distinct or query.combinator
+        or query.is_sliced
+    )
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that estimates the count of a large unfiltered table.
+
+    The estimate covers the whole table only; a filtered, distinct or
+    sliced queryset, such as a changelist with filters or a search, is
+    always counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not hasattr(queryset, 'query') or not is_whole_table(queryset):
+            return super().count
+        estimate = estimate_count(queryset.model, queryset.db)
+        if estimate is None or estimate < ESTIMATED_COUNT_THRESHOLD:
+            return super().count
+        return estimate
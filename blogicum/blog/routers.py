@@ -0,0 +1,22 @@
+from contextvars import ContextVar
+
+from django.db import DEFAULT_DB_ALIAS
+
+read_database = ContextVar('read_database', default=DEFAULT_DB_ALIAS)
+
+
+class ReplicaRouter:
+    """Send reads to the database chosen for the current request.
+
+    ReplicaRoutingMiddleware picks the replica for read-only views; writes
+    always go to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        return read_database.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
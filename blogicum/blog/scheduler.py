@@ -0,0 +1,75 @@
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.db.models import Min
+from django.dispatch import Signal
+from django.http import HttpRequest
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from .models import Post
+from .service import get_posts_query_set
+
+# Sent with ``post`` once a scheduled post reaches its pub_date.
+post_became_visible = Signal()
+
+
+def next_publication(now=None):
+    """Return the nearest pending pub_date, read from post_pub_date_idx."""
+    return Post.objects.filter(
+        is_published=True, pub_date__gt=now or timezone.now()
+    ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
+
+
+def publish_due(since, until):
+    """Send post_became_visible for posts that became visible in the range.
+
+    Returns the number of posts announced.
+    """
+    posts = get_posts_query_set().filter(
+        pub_date__gt=since, pub_date__lte=until
+    ).order_by('pub_date')
+    count = 0
+    for count, post in enumerate(posts, 1):
+        post_became_visible.send(sender=Post, post=post)
+    return count
+
+
+def listing_paths(post):
+    paths = [
+        reverse('blog:index'),
+        reverse('blog:profile', args=[post.author.username]),
+    ]
+    if post.category_id:
+        paths.append(reverse('blog:category_posts', args=[post.category.slug]))
+    return paths
+
+
+def anonymous_get(path):
+    """Build a bare GET request for ``path`` from an anonymous visitor."""
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = path
+    request.META = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path,
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80',
+    }
+    request.user = AnonymousUser()
+    request.resolver_match = resolve(path)
+    return request
+
+
+def warm_pages(paths):
+    """Render the first page of each listing the way an anonymous GET would.
+
+    cache_anonymous_page stores the result, so the first visitor after a
+    publication does not pay for the render.
+    """
+    for path in paths:
+        request = anonymous_get(path)
+        match = request.resolver_match
+        view = match.func
+        if asyncio.iscoroutinefunction(view):
+            view = async_to_sync(view)
+        view(request, *match.args, **match.kwargs)
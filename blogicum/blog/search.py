@@ -0,0 +1,131 @@
+import re
+from functools import lru_cache
+
+from django.db import connection, connections
+from django.db.models import BooleanField, FloatField, Func
+from django.db.models.expressions import RawSQL
+
+try:
+    import snowballstemmer
+except ImportError:
+    snowballstemmer = None
+
+SEARCH_TABLE = 'blog_post_search'
+WORD = re.compile(r'\w+')
+# Weights of title and text in the SQLite bm25() ranking.
+TITLE_WEIGHT, TEXT_WEIGHT = 10.0, 1.0
+PG_DOCUMENT = (
+    "to_tsvector('russian', blog_post.title || ' ' || blog_post.text)"
+)
+
+if snowballstemmer is not None:
+    # Word frequencies are Zipfian, so a cache skips most stemming work.
+    _stem = lru_cache(maxsize=100000)(
+        snowballstemmer.stemmer('russian').stemWord
+    )
+else:
+    def _stem(word):
+        return word
+
+
+def normalize(text):
+    """Lowercase ``text`` and reduce its words to Russian stems."""
+    words = WORD.findall(text.lower().replace('ё', 'е'))
+    return ' '.join(_stem(word) for word in words)
+
+
+class BM25(Func):
+    """bm25() rank of the FTS5 row that ``expression`` is a column of."""
+
+    output_field = FloatField()
+
+    def as_sql(self, compiler, connection):
+        column, = self.get_source_expressions()
+        table = compiler.quote_name_unless_alias(column.alias)
+        return f'bm25({table}, {TITLE_WEIGHT}, {TEXT_WEIGHT})', []
+
+
+def index_post(post):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [post.pk]
+        )
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+            'VALUES (%s, %s, %s)',
+            [post.pk, normalize(post.title), normalize(post.text)]
+        )
+
+
+def unindex_post(post_id):
+    unindex_posts([post_id])
+
+
+def unindex_posts(post_ids):
+    if connection.vendor != 'sqlite' or not post_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(post_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})',
+            list(post_ids)
+        )
+
+
+def rebuild_index(posts, batch_size=1000):
+    """Replace the index with ``posts``, e.g. after bulk_create()."""
+    database = connections[posts.db]
+    if database.vendor != 'sqlite':
+        return 0
+    count = 0
+    rows = posts.values_list('pk', 'title', 'text').order_by('pk')
+    with database.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        batch = []
+        for pk, title, text in rows.iterator(chunk_size=batch_size):
+            batch.append((pk, normalize(title), normalize(text)))
+            if len(batch) == batch_size:
+                count += _insert(cursor, batch)
+                batch = []
+        count += _insert(cursor, batch)
+    return count
+
+
+def _insert(cursor, rows):
+    cursor.executemany(
+        f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+        'VALUES (%s, %s, %s)',
+        rows
+    )
+    return len(rows)
+
+
+def search_posts(posts, query):
+    """Filter ``posts`` to those matching ``query``, best matches first.
+
+    SQLite reads the FTS5 table kept in sync by blog.signals; PostgreSQL
+    uses the GIN index over the Russian tsvector of title and text.
+    """
+    if connection.vendor == 'postgresql':
+        return posts.annotate(
+            matches=RawSQL(
+                f"{PG_DOCUMENT} @@ websearch_to_tsquery('russian', %s)",
+                (query,), output_field=BooleanField()
+            ),
+            rank=RawSQL(
+                f"-ts_rank({PG_DOCUMENT}, "
+                "websearch_to_tsquery('russian', %s))",
+                (query,), output_field=FloatField()
+            ),
+        ).filter(matches=True).order_by('rank', '-pub_date')
+    terms = normalize(query).split()
+    if not terms:
+        return posts.none()
+    match = ' '.join(f'"{term}"*' for term in terms)
+    # A join lets FTS5 compute bm25() once per match; a correlated
+    # subquery would re-run MATCH for every row.
+    return posts.filter(search_document__title__match=match).annotate(
+        rank=BM25('search_document__title')
+    ).order_by('rank', '-pub_date')
@@ -1,10 +1,21 @@
+from functools import wraps
+
+from django.conf import settings
 from django.core.paginator import Paginator
-from django.db.models import Count
+from django.db import router, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.deletion import Collector
+from django.db.models.functions import Coalesce, Greatest
 from django.shortcuts import get_object_or_404, redirect
 from django.utils import timezone
 
-from .constants import NUMBER_OF_POSTS_ON_PAGE
+from .cache import (GLOBAL_SCOPE, bump_listings, invalidation_batch,
+                    stored_listing_scopes)
+from .constants import (BULK_CHUNK_SIZE, NUMBER_OF_COMMENTS_ON_PAGE,
+                        NUMBER_OF_POSTS_ON_PAGE)
 from .models import Comment, Post
+from .paginators import CursorPaginator
+from .search import unindex_posts
 
 
 def get_posts_query_set(owner=None):
@@ -15,30 +26,153 @@ def get_posts_query_set(owner=None):
                   'pub_date__lte': timezone.now()}
     return (Post.objects.select_related(
         'category', 'location', 'author'
-    ).filter(**kwargs).annotate(
-        comment_count=Count('comments')
-    ).order_by('-pub_date'))
+    ).filter(**kwargs).order_by('-pub_date'))
+
+
+def is_visible(post, user):
+    if post.author_id == user.pk:
+        return True
+    return (
+        post.is_published and post.pub_date <= timezone.now()
+        and post.category is not None and post.category.is_published
+    )
+
+
+def change_comment_count(post_id, delta):
+    Post.objects.filter(pk=post_id).update(
+        # Clamped so that drift never blocks deleting a comment.
+        comment_count=Greatest(F('comment_count') + delta, 0),
+        updated_at=timezone.now()
+    )
+    bump_listings(stored_listing_scopes(post_id))
+
+
+def touch_post(post_id):
+    Post.objects.filter(pk=post_id).update(updated_at=timezone.now())
+
+
+def create_comment(comment):
+    with transaction.atomic():
+        comment.save()
+        change_comment_count(comment.post_id, 1)
+
+
+def update_comment(comment):
+    with transaction.atomic():
+        comment.save()
+        touch_post(comment.post_id)
+
+
+def remove_comments(comments):
+    with transaction.atomic(), invalidation_batch():
+        per_post = list(
+            comments.order_by().values_list('post').annotate(total=Count('pk'))
+        )
+        comments.delete()
+        for post_id, total in per_post:
+            change_comment_count(post_id, -total)
+
 
+def remove_comment(comment):
+    with transaction.atomic():
+        comment.delete()
+        change_comment_count(comment.post_id, -1)
 
-def get_paginator(request, posts):
+
+def recount_comments(posts=None):
+    posts = Post.objects.all() if posts is None else posts
+    counts = Comment.objects.filter(post=OuterRef('pk')).order_by().values(
+        'post'
+    ).annotate(total=Count('pk')).values('total')
+    return posts.update(comment_count=Coalesce(Subquery(counts), 0))
+
+
+def _chunked_ids(posts, chunk_size):
+    ids = posts.order_by('pk').values_list('pk', flat=True)
+    last_id = 0
+    while True:
+        chunk = list(ids.filter(pk__gt=last_id)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1]
+
+
+def update_posts(posts, chunk_size=BULK_CHUNK_SIZE, **values):
+    """Update ``posts`` chunk by chunk, yielding the running total.
+
+    update() sends no signals, so the listings are invalidated here, once
+    for the whole run; the new updated_at retires the cards.
+    """
+    updated = 0
+    with invalidation_batch():
+        for ids in _chunked_ids(posts, chunk_size):
+            updated += Post.objects.filter(pk__in=ids).update(
+                updated_at=timezone.now(), **values
+            )
+            yield updated
+        bump_listings([GLOBAL_SCOPE])
+
+
+def delete_posts(posts, chunk_size=BULK_CHUNK_SIZE):
+    """Delete ``posts`` with their comments, yielding the running total.
+
+    Each chunk is loaded with the category and author its post_delete
+    receivers read, and leaves the search index and the caches in one go,
+    so the queries per chunk do not grow with its size.
+    """
+    deleted = 0
+    using = router.db_for_write(Post)
+    for ids in _chunked_ids(posts, chunk_size):
+        with transaction.atomic(using=using), invalidation_batch():
+            chunk = list(Post.objects.using(using).select_related(
+                'category', 'author'
+            ).filter(pk__in=ids))
+            unindex_posts(ids)
+            for post in chunk:
+                post._search_unindexed = True
+            collector = Collector(using=using)
+            collector.collect(chunk)
+            _, per_model = collector.delete()
+        deleted += per_model.get(Post._meta.label, 0)
+        yield deleted
+
+
+def get_paginator(request, posts, ranked=False):
+    # Ranked results are not ordered by the keyset of CursorPaginator.
+    if settings.POSTS_CURSOR_PAGINATION and not ranked:
+        paginator = CursorPaginator(posts, NUMBER_OF_POSTS_ON_PAGE)
+        return paginator.get_page(request.GET.get('cursor'))
     page_number = request.GET.get('page')
     paginator = Paginator(posts, NUMBER_OF_POSTS_ON_PAGE)
     return paginator.get_page(page_number)
 
 
+def get_comments_page(post, cursor=None):
+    paginator = CursorPaginator(
+        post.comments.select_related('author'), NUMBER_OF_COMMENTS_ON_PAGE,
+        ordering=('created_at', 'id')
+    )
+    return paginator.get_page(cursor)
+
+
 def authorize(func):
-    def wrapper(*args, **kwargs):
+    """Load the post or comment once and pass it to the view.
+
+    Users other than the author are redirected to the post page.
+    """
+    @wraps(func)
+    def wrapper(request, *args, **kwargs):
         if kwargs.get('comment_id'):
-            instance = get_object_or_404(Comment, id=kwargs.get('comment_id'))
-            if not args[0].user.id == instance.author_id:
-                return redirect(
-                    'blog:post_detail', post_id=kwargs.get('post_id')
-                )
-        elif kwargs.get('post_id'):
-            instance = get_object_or_404(Post, id=kwargs.get('post_id'))
-            if not args[0].user.id == instance.author_id:
-                return redirect(
-                    'blog:post_detail', post_id=kwargs.get('post_id')
-                )
-        return func(*args, **kwargs)
+            name, instance = 'comment', get_object_or_404(
+                Comment, id=kwargs['comment_id'], post_id=kwargs['post_id']
+            )
+        else:
+            name, instance = 'post', get_object_or_404(
+                Post.objects.select_related('author', 'category', 'location'),
+                id=kwargs['post_id']
+            )
+        if not request.user.id == instance.author_id:
+            return redirect('blog:post_detail', post_id=kwargs['post_id'])
+        return func(request, *args, **kwargs, **{name: instance})
     return wrapper
@@ -0,0 +1,153 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (FileResponse, Http404, HttpResponse,
+                         StreamingHttpResponse)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from .staticfiles import ENCODINGS
+from .storage import is_content_addressed
+
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+FINGERPRINTED = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+CHUNK_SIZE = 64 * 1024
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=3600'
+
+
+def _parse_range(header, size):
+    """Return ``(start, end)`` of a single byte range, or None if invalid."""
+    match = RANGE_HEADER.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end:
+        return None
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def _negotiate_encoding(request, full_path):
+    accepted = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    for encoding, suffix in ENCODINGS.items():
+        if re.search(rf'\b{encoding}\b', accepted) and os.path.isfile(
+            full_path + suffix
+        ):
+            return encoding, suffix
+    return None, ''
+
+
+def serve_file(request, root, path, accel_prefix, immutable=False,
+               precompressed=False):
+    """Serve ``path`` under ``root`` with validators and cache headers.
+
+    With SENDFILE_BACKEND the front server sends the bytes, found under
+    ``accel_prefix`` for X-Accel-Redirect; otherwise full files go through
+    FileResponse (wsgi.file_wrapper) and single byte ranges are streamed
+    from an offset. ``precompressed`` picks a .br/.gz sibling of the file
+    by Accept-Encoding.
+    """
+    try:
+        full_path = safe_join(root, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    content_type = (
+        mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    )
+    encoding, suffix = (
+        _negotiate_encoding(request, full_path) if precompressed
+        else (None, '')
+    )
+    path, full_path = path + suffix, full_path + suffix
+    stat = os.stat(full_path)
+    etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        response = _body_response(
+            request, full_path, path, accel_prefix, content_type, etag
+        )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    response['Cache-Control'] = IMMUTABLE if immutable else REVALIDATE
+    if encoding:
+        response['Content-Encoding'] = encoding
+    if precompressed:
+        patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+def _body_response(request, full_path, path, accel_prefix, content_type,
+                   etag):
+    if settings.SENDFILE_BACKEND == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response['X-Accel-Redirect'] = quote(accel_prefix + path)
+    elif settings.SENDFILE_BACKEND == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = full_path
+    else:
+        response = _file_response(request, full_path, etag)
+        response['Content-Type'] = content_type
+    return response
+
+
+def _file_response(request, full_path, etag):
+    size = os.path.getsize(full_path)
+    header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not header or (if_range and if_range != etag):
+        return FileResponse(open(full_path, 'rb'))
+    byte_range = _parse_range(header, size)
+    if byte_range is None:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    start, end = byte_range
+    response = StreamingHttpResponse(
+        _read_range(full_path, start, end - start + 1), status=206
+    )
+    response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Content-Length'] = end - start + 1
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    return serve_file(
+        request, settings.MEDIA_ROOT, path, settings.MEDIA_ACCEL_PREFIX,
+        immutable=is_content_addressed(path)
+    )
+
+
+@require_safe
+def serve_static(request, path):
+    return serve_file(
+        request, settings.STATIC_ROOT, path, settings.STATIC_ACCEL_PREFIX,
+        immutable=bool(FINGERPRINTED.search(path)), precompressed=True
+    )
@@ -0,0 +1,163 @@
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Greatest
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import (GLOBAL_SCOPE, bump_listings, invalidate_post_cards,
+                    post_listing_scopes, stored_listing_scopes)
+from .images import release_image, schedule_variants
+from .metrics import instrument_connection
+from .models import Category, Comment, Location, Post
+from .scheduler import listing_paths, post_became_visible, warm_pages
+from .search import index_post, unindex_post, unindex_posts
+
+User = get_user_model()
+
+# Authors being deleted. related_changed has already bumped every listing,
+# so their posts skip loading the category and author one by one.
+_deleted_authors = ContextVar('deleted_authors', default=frozenset())
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_listings(sender, instance, **kwargs):
+    loaded_ids = getattr(instance, '_loaded_listing_ids', None)
+    if not instance.pk or loaded_ids == (
+        instance.category_id, instance.author_id
+    ):
+        # post_changed already covers the listings the post is in now.
+        instance._stored_listing_scopes = set()
+    else:
+        instance._stored_listing_scopes = stored_listing_scopes(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender, instance, **kwargs):
+    # The save moved updated_at, which retires the cached card.
+    if instance.author_id in _deleted_authors.get():
+        return
+    category_slug = instance.category.slug if instance.category_id else None
+    bump_listings(
+        post_listing_scopes(category_slug, instance.author.username)
+        | getattr(instance, '_stored_listing_scopes', set())
+    )
+
+
+@receiver(post_save, sender=Post)
+def post_image_changed(sender, instance, **kwargs):
+    loaded_image = getattr(instance, '_loaded_image', None)
+    if instance.image and instance.image.name != loaded_image:
+        schedule_variants(instance)
+    if loaded_image and loaded_image != instance.image.name:
+        release_image(instance.image.storage, loaded_image)
+
+
+@receiver(post_save, sender=Post)
+def post_search_changed(sender, instance, **kwargs):
+    index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def post_search_deleted(sender, instance, **kwargs):
+    # service.delete_posts and author_delete_started unindex at once.
+    if not (
+        getattr(instance, '_search_unindexed', False)
+        or instance.author_id in _deleted_authors.get()
+    ):
+        unindex_post(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def post_image_deleted(sender, instance, **kwargs):
+    if instance.image:
+        release_image(instance.image.storage, instance.image.name)
+
+
+@receiver(post_became_visible)
+def scheduled_post_visible(sender, post, **kwargs):
+    invalidate_post_cards([post.pk])
+    bump_listings(post_listing_scopes(
+        post.category.slug if post.category_id else None,
+        post.author.username
+    ))
+    warm_pages(listing_paths(post))
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+@receiver(post_save, sender=User)
+@receiver(pre_delete, sender=User)
+def related_changed(sender, instance, created=False, update_fields=None,
+                    **kwargs):
+    if created or update_fields == {'last_login'}:
+        return
+    lookup = {
+        Category: 'category', Location: 'location', User: 'author'
+    }[sender]
+    invalidate_post_cards(
+        Post.objects.filter(**{lookup: instance}).values_list('pk', flat=True)
+    )
+    bump_listings([GLOBAL_SCOPE])
+
+
+@receiver(pre_delete, sender=User)
+def author_delete_started(sender, instance, **kwargs):
+    _deleted_authors.set(_deleted_authors.get() | {instance.pk})
+    unindex_posts(list(
+        Post.objects.filter(author=instance).values_list('pk', flat=True)
+    ))
+
+
+@receiver(post_delete, sender=User)
+def author_delete_finished(sender, instance, **kwargs):
+    # post_delete keeps the pk of the deleted instance.
+    _deleted_authors.set(_deleted_authors.get() - {instance.pk})
+
+
+@receiver(pre_delete, sender=User)
+def commenter_deleted(sender, instance, **kwargs):
+    # The cascade bypasses service.remove_comments, so the posts of other
+    # authors lose the user's comments here, in one UPDATE for all.
+    comments = Comment.objects.filter(author=instance).exclude(
+        post__author=instance
+    )
+    posts = Post.objects.filter(pk__in=comments.values('post'))
+    stored = list(
+        posts.values_list('pk', 'category__slug', 'author__username')
+    )
+    if not stored:
+        return
+    totals = comments.filter(post=OuterRef('pk')).order_by().values(
+        'post'
+    ).annotate(total=Count('pk')).values('total')
+    posts.update(
+        comment_count=Greatest(F('comment_count') - Subquery(totals), 0),
+        updated_at=timezone.now()
+    )
+    bump_listings(set().union(*(
+        post_listing_scopes(category_slug, username)
+        for _, category_slug, username in stored
+    )))
+
+
+@receiver(connection_created)
+def configure_sqlite(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {pragma} = {value}')
+
+
+@receiver(connection_created)
+def instrument_queries(sender, connection, **kwargs):
+    instrument_connection(connection)
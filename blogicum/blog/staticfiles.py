@@ -0,0 +1,92 @@
+import gzip
+from io import BytesIO
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from PIL import Image
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.ico', '.json', '.map', '.txt', '.xml', '.html'
+)
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+
+def optimize_png(data):
+    """Re-encode a PNG at maximum compression if no pixel changes."""
+    image = Image.open(BytesIO(data))
+    buffer = BytesIO()
+    image.save(buffer, format='PNG', optimize=True)
+    optimized = buffer.getvalue()
+    if len(optimized) >= len(data):
+        return data
+    result = Image.open(BytesIO(optimized))
+    if result.mode != image.mode or result.tobytes() != image.tobytes():
+        return data
+    return optimized
+
+
+def compress(data):
+    """Return ``{suffix: payload}`` for encodings that shrink ``data``."""
+    payloads = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        payloads['.br'] = brotli.compress(data, quality=11)
+    return {
+        suffix: payload for suffix, payload in payloads.items()
+        if len(payload) < len(data)
+    }
+
+
+class PrecompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Fingerprinted static files with optimised PNGs and .gz/.br siblings.
+
+    Without a manifest (collectstatic has not run) URLs fall back to the
+    plain file names instead of raising.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = {
+                name: (self, name) if self._optimize(name) else source
+                for name, source in paths.items()
+            }
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if not dry_run and not isinstance(processed, Exception):
+                self._write_compressed(name)
+                if hashed_name:
+                    self._write_compressed(hashed_name)
+            yield name, hashed_name, processed
+
+    def url(self, name, force=False):
+        if not self.hashed_files:
+            return FileSystemStorage.url(self, name)
+        return super().url(name, force)
+
+    def _optimize(self, name):
+        if not name.lower().endswith('.png'):
+            return False
+        with self.open(name) as file:
+            data = file.read()
+        optimized = optimize_png(data)
+        if optimized is data:
+            return False
+        self.delete(name)
+        self._save(name, ContentFile(optimized))
+        return True
+
+    def _write_compressed(self, name):
+        if not name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+            return
+        with self.open(name) as file:
+            data = file.read()
+        for suffix, payload in compress(data).items():
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(payload))
@@ -0,0 +1,49 @@
+import hashlib
+import os
+import posixpath
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+CONTENT_ADDRESSED_NAME = re.compile(r'(^|/)[0-9a-f]{2}/[0-9a-f]{64}(_\d+w)?\.')
+
+
+def is_content_addressed(name):
+    return CONTENT_ADDRESSED_NAME.search(name) is not None
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Store each distinct file once, named after its SHA-256 digest.
+
+    ``post_image/photo.jpg`` becomes ``post_image/ab/ab12…ef.jpg``; a
+    second upload of the same bytes reuses the stored file. Names that
+    are already content-addressed, such as image variants, are kept.
+    """
+
+    def save(self, name, content, max_length=None):
+        if not is_content_addressed(name):
+            digest = (
+                getattr(content, 'content_hash', None) or self.digest(content)
+            )
+            directory, filename = posixpath.split(name)
+            extension = posixpath.splitext(filename)[1].lower()
+            name = posixpath.join(directory, digest[:2], digest + extension)
+        if self.exists(name):
+            # A reused file counts as new for the orphan min-age guard, so
+            # it is not released before the post that reuses it commits.
+            os.utime(self.path(name))
+            return name
+        return super().save(name, content, max_length)
+
+    @staticmethod
+    def digest(content):
+        hasher = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            hasher.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        return hasher.hexdigest()
@@ -0,0 +1,19 @@
+from django import template
+from django.conf import settings
+
+from blog.images import existing_variants
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card_timeout():
+    return settings.POST_CARD_CACHE_TIMEOUT
+
+
+@register.simple_tag
+def image_srcset(field_file, extension):
+    return ', '.join(
+        f'{field_file.storage.url(name)} {width}w'
+        for name, width in existing_variants(field_file, extension)
+    )
@@ -0,0 +1,33 @@
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+
+class HashingUploadHandler(TemporaryFileUploadHandler):
+    """Spool uploads to disk chunk by chunk and hash them on the way.
+
+    Listed after MemoryFileUploadHandler, it receives the requests larger
+    than FILE_UPLOAD_MAX_MEMORY_SIZE.
+
+    Bytes past MAX_IMAGE_UPLOAD_SIZE are counted but not written, so the
+    disk does not fill up. Such a file keeps its full ``size`` and is marked
+    ``oversized``; StreamedImageField rejects it in every form.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received <= settings.MAX_IMAGE_UPLOAD_SIZE:
+            self.hasher.update(raw_data)
+            self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        uploaded.content_hash = self.hasher.hexdigest()
+        uploaded.oversized = self.received > settings.MAX_IMAGE_UPLOAD_SIZE
+        return uploaded
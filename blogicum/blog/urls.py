@@ -1,24 +1,31 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = 'blog'
 
+read_views = async_views if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
     path('posts/<int:post_id>/delete/', views.delete_post, name='delete_post'),
     path(
         'posts/<int:post_id>/comment/', views.add_comment, name='add_comment'
     ),
-    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('posts/<int:post_id>/', read_views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/', views.post_comments, name='comments'
+    ),
     path('posts/create/', views.create_post, name='create_post'),
     path('posts/<int:post_id>/edit/', views.edit_post, name='edit_post'),
-    path('category/<slug:category>/', views.category_posts,
+    path('category/<slug:category>/', read_views.category_posts,
          name='category_posts'),
     path('posts/<int:post_id>/edit_comment/<int:comment_id>/',
          views.edit_comment, name='edit_comment'),
     path('posts/<int:post_id>/delete_comment/<int:comment_id>/',
          views.delete_comment, name='delete_comment'),
+    path('search/', views.search, name='search'),
     path('profile/edit_profile/', views.edit_profile, name='edit_profile'),
-    path('profile/<str:username>/', views.profile_info, name='profile'),
-    path('', views.index, name='index'),
+    path('profile/<str:username>/', read_views.profile_info, name='profile'),
+    path('', read_views.index, name='index'),
 ]
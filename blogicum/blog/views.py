@@ -1,12 +1,23 @@
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.http import urlencode
 
+from .cache import (cache_anonymous_page, category_listing, index_listing,
+                    profile_listing)
+from .conditional import (conditional_page, listing_validators,
+                          post_detail_validators, respond_conditionally)
 from .forms import CommentForm, PostForm, UserForm
-from .models import Category, Comment, Post
-from .service import authorize, get_paginator, get_posts_query_set
+from .models import Category, Post
+from .search import search_posts
+from .service import (authorize, create_comment, get_comments_page,
+                      get_paginator, get_posts_query_set, is_visible,
+                      remove_comment, update_comment)
 
 
+@conditional_page(listing_validators(index_listing))
+@cache_anonymous_page(index_listing)
 def index(request):
     posts = get_posts_query_set()
     page_obj = get_paginator(request, posts)
@@ -14,17 +25,50 @@ def index(request):
 
 
 def post_detail(request, post_id):
-    post = get_object_or_404(Post.objects, id=post_id)
-    if not post.author == request.user:
-        post = get_object_or_404(get_posts_query_set(), id=post_id)
-    comment = post.comments.select_related('author')
-    form = CommentForm()
+    post = get_object_or_404(
+        Post.objects.select_related('category', 'location', 'author'),
+        id=post_id
+    )
+    if not is_visible(post, request.user):
+        raise Http404
+    return respond_conditionally(
+        request, *post_detail_validators(request, post),
+        lambda: render(request, 'blog/detail.html', {
+            'post': post,
+            'comments': get_comments_page(post),
+            'form': CommentForm(),
+        })
+    )
+
+
+def post_comments(request, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('category'), id=post_id
+    )
+    if not is_visible(post, request.user):
+        raise Http404
+    comments = get_comments_page(post, request.GET.get('cursor'))
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'comments': [
+                {
+                    'id': comment.id,
+                    'author': comment.author.username,
+                    'text': comment.text,
+                    'created_at': comment.created_at,
+                }
+                for comment in comments
+            ],
+            'next_cursor': comments.next_cursor,
+        })
     return render(
-        request, 'blog/detail.html',
-        {'post': post, 'comments': comment, 'form': form}
+        request, 'includes/comment_list.html',
+        {'post': post, 'comments': comments}
     )
 
 
+@conditional_page(listing_validators(category_listing))
+@cache_anonymous_page(category_listing)
 def category_posts(request, category):
     category = get_object_or_404(Category, slug=category, is_published=True)
     post_list = get_posts_query_set().filter(category=category)
@@ -33,6 +77,20 @@ def category_posts(request, category):
                   {'category': category, 'page_obj': page_obj})
 
 
+def search(request):
+    query = request.GET.get('q', '').strip()
+    posts = (
+        search_posts(get_posts_query_set(), query) if query
+        else Post.objects.none()
+    )
+    page_obj = get_paginator(request, posts, ranked=True)
+    return render(request, 'blog/search.html', {
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': urlencode({'q': query}) + '&',
+    })
+
+
 @login_required
 def create_post(request):
     form = PostForm(request.POST or None, files=request.FILES or None,)
@@ -47,8 +105,7 @@ def create_post(request):
 
 @login_required
 @authorize
-def edit_post(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
+def edit_post(request, post_id, post):
     form = PostForm(request.POST or None, instance=post)
     if form.is_valid():
         form.save()
@@ -59,13 +116,11 @@ def edit_post(request, post_id):
 
 @login_required
 @authorize
-def delete_post(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    form = PostForm(request.POST or None, instance=post)
+def delete_post(request, post_id, post):
     if request.method == 'POST':
         post.delete()
         return redirect('blog:index')
-    context = {'form': form}
+    context = {'form': PostForm(instance=post)}
     return render(request, 'blog/create.html', context)
 
 
@@ -76,17 +131,16 @@ def add_comment(request, post_id):
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = get_object_or_404(Post, id=post_id)
-        comment.save()
+        create_comment(comment)
     return redirect('blog:post_detail', post_id=post_id)
 
 
 @login_required
 @authorize
-def edit_comment(request, post_id, comment_id):
-    comment = get_object_or_404(Comment, id=comment_id)
+def edit_comment(request, post_id, comment_id, comment):
     form = CommentForm(request.POST or None, instance=comment)
     if form.is_valid():
-        form.save()
+        update_comment(form.save(commit=False))
         return redirect('blog:post_detail', post_id=post_id)
     context = {'form': form}
     return render(request, 'blog/create.html', context)
@@ -94,15 +148,16 @@ def edit_comment(request, post_id, comment_id):
 
 @login_required
 @authorize
-def delete_comment(request, post_id, comment_id):
-    comment = get_object_or_404(Comment, id=comment_id)
+def delete_comment(request, post_id, comment_id, comment):
     if request.method == 'POST':
-        comment.delete()
+        remove_comment(comment)
         return redirect('blog:post_detail', post_id=post_id)
     context = {'comment': comment}
     return render(request, 'blog/comment.html', context)
 
 
+@conditional_page(listing_validators(profile_listing))
+@cache_anonymous_page(profile_listing)
 def profile_info(request, username):
     profile = get_object_or_404(User, username=username)
     if not profile == request.user:
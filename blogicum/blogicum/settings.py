@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -22,11 +23,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'blog.middleware.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -35,12 +38,27 @@ ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
 
+# Templates are compiled once per process, at startup by the wsgi/asgi
+# entry points. TEMPLATE_RELOAD=1 rereads them on every render, for
+# development only.
+TEMPLATE_RELOAD = bool(os.getenv('TEMPLATE_RELOAD'))
+
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not TEMPLATE_RELOAD:
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
+        'APP_DIRS': False,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -54,10 +72,77 @@ TEMPLATES = [
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
-DATABASES = {
+# POSTGRES_DB switches to PostgreSQL; DB_PGBOUNCER=1 when connections go
+# through a transaction-pooling PgBouncer.
+if os.getenv('POSTGRES_DB'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB'),
+            'USER': os.getenv('POSTGRES_USER', ''),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('POSTGRES_HOST', ''),
+            'PORT': os.getenv('POSTGRES_PORT', ''),
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+            'DISABLE_SERVER_SIDE_CURSORS': bool(os.getenv('DB_PGBOUNCER')),
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', 60)),
+        }
+    }
+
+# A read replica of the primary: POSTGRES_REPLICA_HOST, or for local
+# testing SQLITE_REPLICA_PATH, a copy of the SQLite file kept in sync.
+if os.getenv('POSTGRES_REPLICA_HOST') and os.getenv('POSTGRES_DB'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv('POSTGRES_REPLICA_HOST'),
+        'PORT': os.getenv('POSTGRES_REPLICA_PORT', ''),
+        'TEST': {'MIRROR': 'default'},
+    }
+elif os.getenv('SQLITE_REPLICA_PATH'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.getenv('SQLITE_REPLICA_PATH'),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+REPLICA_DATABASE = 'replica' if 'replica' in DATABASES else None
+
+REPLICA_VIEWS = (
+    'blog:index', 'blog:category_posts', 'blog:profile', 'blog:post_detail',
+    'blog:search',
+)
+
+# Replication lag budget: a session reads from the primary this long after
+# its last write.
+REPLICA_STICKY_SECONDS = 10
+
+# Applied to every new SQLite connection by blog.signals.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# LocMemCache is per process; publish_scheduled and multi-worker servers
+# need a shared backend such as Redis or Memcached in CACHE_BACKEND.
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'blogicum'),
     }
 }
 
@@ -90,12 +175,22 @@ USE_TZ = True
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
+MEDIA_URL = '/media/'
+
+DEFAULT_FILE_STORAGE = 'blog.storage.ContentAddressedStorage'
+
 STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [
     BASE_DIR / 'static_dev',
 ]
 
+STATIC_ROOT = BASE_DIR / 'static'
+
+STATICFILES_STORAGE = (
+    'blog.staticfiles.PrecompressedManifestStaticFilesStorage'
+)
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = 'login'
@@ -115,3 +210,75 @@ INTERNAL_IPS = [
 ]
 
 CSRF_FAILURE_VIEW = 'pages.views.forbidden'
+
+POSTS_CURSOR_PAGINATION = False
+
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+ANONYMOUS_PAGE_CACHE_TIMEOUT = 60 * 10
+
+IMAGE_WORKERS = 2
+
+# Small requests stay in memory; the rest is spooled and hashed on disk.
+FILE_UPLOAD_HANDLERS = [
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'blog.uploads.HashingUploadHandler',
+]
+
+MAX_IMAGE_UPLOAD_SIZE = 10 * 1024 * 1024
+
+MAX_IMAGE_PIXELS = 40_000_000
+
+# Unreferenced images younger than this, in seconds, are kept: the post
+# that uploaded or reused one may not be committed yet.
+ORPHAN_IMAGE_MIN_AGE = 60 * 60
+
+# '' serves files from Django, 'x-accel-redirect' hands them to nginx
+# (internal locations at the *_ACCEL_PREFIX paths), 'x-sendfile' to Apache.
+SENDFILE_BACKEND = os.getenv('SENDFILE_BACKEND', '')
+
+MEDIA_ACCEL_PREFIX = '/protected/media/'
+
+STATIC_ACCEL_PREFIX = '/protected/static/'
+
+# Async read views (blog.async_views) for ASGI deployments; asgi.py turns
+# them on.
+ASYNC_VIEWS = bool(os.getenv('ASYNC_VIEWS'))
+
+# Requests of the async views querying at once in one process. Each
+# worker thread keeps its own connection, so workers times this should
+# stay within the database connection limit.
+ASYNC_DB_CONCURRENCY = int(os.getenv('ASYNC_DB_CONCURRENCY', 8))
+
+# A request that runs one statement shape this many times is logged as a
+# likely N+1 query.
+METRICS_DUPLICATE_THRESHOLD = 5
+
+# Prometheus scrapes /metrics/ with "Authorization: Bearer <token>"; with
+# no token set only staff users can read it.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Times every template and include tag of a request for the metrics and
+# the request log.
+TEMPLATE_PROFILING = bool(os.getenv('TEMPLATE_PROFILING'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'blog.metrics.JsonFormatter'},
+    },
+    'handlers': {
+        'metrics': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'json',
+        },
+    },
+    'loggers': {
+        'blog.metrics': {
+            'handlers': ['metrics'],
+            'level': os.getenv('METRICS_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
@@ -1,10 +1,12 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path, reverse_lazy
 from django.views.generic.edit import CreateView
 
+from blog.metrics import metrics_view
+from blog.serving import serve_media, serve_static
+
 handler404 = 'pages.views.not_found'
 handler500 = 'pages.views.server_error'
 
@@ -17,10 +19,14 @@ urlpatterns = [
         success_url=reverse_lazy('blog:index')
     ), name='registration'),
     path('pages/', include('pages.urls')),
+    path('metrics/', metrics_view, name='metrics'),
+    path(
+        settings.MEDIA_URL.lstrip('/') + '<path:path>', serve_media,
+        name='media'
+    ),
+    path(
+        settings.STATIC_URL.lstrip('/') + '<path:path>', serve_static,
+        name='static'
+    ),
     path('', include('blog.urls')),
-]+static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )
+]
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_wsgi_application()
+
+# Imported once the application has configured settings and apps.
+from blog.templating import warm_templates  # noqa: E402
+
+warm_templates()
@@ -0,0 +1,38 @@
+"""Gunicorn settings, read from the working directory by default.
+
+ASGI, with the async read views:
+    gunicorn blogicum.asgi:application
+WSGI, for comparison:
+    GUNICORN_WORKER_CLASS=gthread gunicorn blogicum.wsgi:application
+
+Requires gunicorn, and uvicorn for the default ASGI worker.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('BIND', '0.0.0.0:8000')
+
+# An event loop keeps slow clients waiting on sockets rather than on
+# threads, so one uvicorn worker per CPU is enough.
+worker_class = os.getenv(
+    'GUNICORN_WORKER_CLASS', 'uvicorn.workers.UvicornWorker'
+)
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+# Used by the gthread worker only.
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Connections waiting to be accepted during a burst.
+backlog = 2048
+# Long enough for a page and its assets over one connection, short
+# enough not to hold idle sockets.
+keepalive = 5
+timeout = 30
+graceful_timeout = 30
+
+# Restart workers now and then to return fragmented memory; the jitter
+# keeps them from restarting together.
+max_requests = 10000
+max_requests_jitter = 1000
+
+# Loads the app once before forking, so workers share its memory pages.
+preload_app = True
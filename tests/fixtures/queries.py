@@ -0,0 +1,101 @@
+from contextlib import ExitStack
+from typing import List, NamedTuple, Optional
+
+import pytest
+from django.conf import settings
+from django.db import connections
+from django.test.client import Client
+from django.urls import Resolver404
+
+from blog.metrics import RequestMetrics, repeated_queries
+
+# Most SQL statements one request to the named route may run, measured on
+# the test fixtures for the costliest case: a logged-in author (session and
+# user lookups) submitting a form. Statement shapes repeated within one
+# request are checked for every route, listed here or not.
+QUERY_BUDGETS = {
+    "blog:index": 5,
+    "blog:category_posts": 6,
+    "blog:profile": 6,
+    "blog:search": 4,
+    "blog:post_detail": 4,
+    "blog:comments": 4,
+    "blog:create_post": 9,
+    "blog:edit_post": 10,
+    "blog:delete_post": 8,
+    "blog:add_comment": 8,
+    "blog:edit_comment": 7,
+    "blog:delete_comment": 8,
+    "blog:edit_profile": 5,
+    "pages:about": 2,
+    "pages:rules": 2,
+    "media": 0,
+    "static": 0,
+    "admin:blog_post_changelist": 19,
+    "admin:blog_post_change": 8,
+    "admin:blog_comment_changelist": 5,
+}
+
+ClientRequest = NamedTuple(
+    "ClientRequest", [("view_name", str), ("statements", List[str])]
+)
+
+
+def _view_name(response) -> str:
+    try:
+        return response.resolver_match.view_name
+    except Resolver404:
+        return "unresolved"
+
+
+def budget_report(
+        view_name: str, statements: List[str], budget: Optional[int],
+        threshold: int
+) -> Optional[str]:
+    """Describe how ``statements`` exceed the budget, or return None."""
+    repeated = repeated_queries(statements, threshold)
+    over_budget = budget is not None and len(statements) > budget
+    if not (repeated or over_budget):
+        return None
+    lines = [
+        f"Маршрут {view_name} выполнил запросов к базе данных:"
+        f" {len(statements)}"
+        + (f" при бюджете {budget}." if budget is not None else ".")
+    ]
+    if repeated:
+        lines.append(
+            "Одинаковые запросы, число которых растёт вместе с числом"
+            " строк на странице (N+1):"
+        )
+        for shape, count in sorted(repeated.items(), key=lambda x: -x[1]):
+            lines.append(f"  {count} × {shape}")
+    return "\n".join(lines)
+
+
+@pytest.fixture(autouse=True)
+def query_budget(monkeypatch):
+    """Check every test client request against QUERY_BUDGETS.
+
+    Returns the list of the test's requests with their SQL statements.
+    """
+    requests = []
+    request = Client.request
+
+    def checked_request(self, **request_kwargs):
+        metrics = RequestMetrics()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(metrics))
+            response = request(self, **request_kwargs)
+        view_name = _view_name(response)
+        requests.append(ClientRequest(view_name, metrics.statements))
+        report = budget_report(
+            view_name, metrics.statements, QUERY_BUDGETS.get(view_name),
+            settings.METRICS_DUPLICATE_THRESHOLD
+        )
+        if report:
+            pytest.fail(report, pytrace=False)
+        return response
+
+    monkeypatch.setattr(Client, "request", checked_request)
+    return requests
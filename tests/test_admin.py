@@ -0,0 +1,159 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.admin.models import DELETION, LogEntry
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+from blog.paginators import EstimatedCountPaginator
+from blog.service import delete_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize("url", ["/admin/blog/post/", "/admin/blog/comment/"])
+def test_changelist_queries_do_not_grow(
+        mixer, user, admin_client, published_category, url
+):
+    def changelist_queries():
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get(url)
+        assert response.status_code == 200
+        return len(queries)
+
+    def blend(n):
+        posts = mixer.cycle(n).blend(
+            "blog.Post", author=user, category=published_category
+        )
+        mixer.cycle(n).blend("blog.Comment", author=user, post=posts[0])
+
+    blend(2)
+    few = changelist_queries()
+    blend(20)
+    assert changelist_queries() == few, (
+        "Убедитесь, что число запросов страницы списка в админке не зависит"
+        " от числа строк."
+    )
+
+
+def test_post_admin_search_and_widgets(
+        mixer, user, admin_client, published_category
+):
+    post = mixer.blend(
+        "blog.Post", title="Осенний лес", author=user,
+        category=published_category,
+    )
+    mixer.blend(
+        "blog.Post", title="Поезд", author=user, category=published_category
+    )
+    in_text = mixer.blend(
+        "blog.Post", title="Прогулка", text="Тропинка через лес",
+        author=user, category=published_category,
+        pub_date=post.pub_date + timedelta(days=1),
+    )
+    response = admin_client.get("/admin/blog/post/", {"q": "лесу"})
+    assert list(response.context["cl"].result_list) == [post, in_text], (
+        "Убедитесь, что результаты поиска в админке упорядочены по"
+        " релевантности."
+    )
+
+    content = admin_client.get(
+        f"/admin/blog/post/{post.id}/change/"
+    ).content.decode("utf-8")
+    assert "admin-autocomplete" in content, (
+        "Убедитесь, что для связанных полей используются виджеты"
+        " автодополнения."
+    )
+
+
+def test_estimated_count_paginator(monkeypatch, mixer, user, another_user):
+    monkeypatch.setattr("blog.paginators.ESTIMATED_COUNT_THRESHOLD", 0)
+    posts = mixer.cycle(3).blend("blog.Post", author=user)
+    posts[0].delete()
+    assert EstimatedCountPaginator(Post.objects.all(), 10).count == 2, (
+        "Убедитесь, что без статистики строки считаются точно."
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")
+    with CaptureQueriesContext(connection) as queries:
+        count = EstimatedCountPaginator(Post.objects.all(), 10).count
+    assert count == 2 and not any(
+        "COUNT" in query["sql"] for query in queries
+    ), (
+        "Убедитесь, что для нефильтрованного списка число строк оценивается"
+        " по статистике, без COUNT(*) и без учёта удалённых строк."
+    )
+    mixer.blend("blog.Post", author=another_user)
+    for queryset in (
+        Post.objects.filter(author=another_user), Post.objects.distinct()
+    ):
+        assert EstimatedCountPaginator(queryset, 10).count == (
+            queryset.count()
+        ), "Убедитесь, что отфильтрованный список считается точно."
+
+
+def test_bulk_post_actions(
+        mixer, user, admin_client, published_category, unlogged_client
+):
+    posts = mixer.cycle(5).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False,
+    )
+    mixer.blend("blog.Comment", post=posts[0], author=user)
+    url = "/admin/blog/post/"
+    assert not unlogged_client.get("/").context["page_obj"].object_list
+
+    response = admin_client.post(url, {
+        "action": "publish", "select_across": "1", "index": "0",
+        "_selected_action": [posts[0].pk],
+    }, follow=True)
+    assert "Опубликовано публикаций: 5" in response.content.decode("utf-8")
+    assert len(unlogged_client.get("/").context["page_obj"]) == 5, (
+        "Убедитесь, что массовая публикация сбрасывает кеш ленты."
+    )
+
+    other = mixer.blend("blog.Category", is_published=True)
+    selected = [str(post.pk) for post in posts[:2]]
+    action = {
+        "action": "move_to_category", "select_across": "0", "index": "0",
+        "_selected_action": selected,
+    }
+    confirmation = admin_client.post(url, action)
+    assert "Выбрано публикаций: 2" in confirmation.content.decode("utf-8")
+    admin_client.post(url, {**action, "apply": "1", "category": other.pk})
+    assert set(Post.objects.filter(category=other)) == set(posts[:2])
+
+    action = {
+        "action": "delete_with_comments", "select_across": "0",
+        "index": "0", "_selected_action": selected,
+    }
+    admin_client.post(url, action)
+    assert Post.objects.count() == 5, (
+        "Убедитесь, что удаление требует подтверждения."
+    )
+    admin_client.post(url, {**action, "apply": "1"})
+    assert Post.objects.count() == 3
+    assert not Comment.objects.exists()
+    assert set(LogEntry.objects.filter(
+        action_flag=DELETION
+    ).values_list("object_id", flat=True)) == set(selected), (
+        "Убедитесь, что удаление публикаций записывается в журнал админки."
+    )
+
+
+@pytest.mark.parametrize("n_posts", [5, 50])
+def test_delete_posts_queries_do_not_grow(
+        mixer, user, published_category, django_assert_num_queries, n_posts
+):
+    posts = mixer.cycle(n_posts).blend(
+        "blog.Post", author=user, category=published_category
+    )
+    for post in posts:
+        mixer.blend("blog.Comment", post=post, author=user)
+    # Keys of one chunk, savepoint, chunk with category and author, search
+    # index, comments, posts, release, empty next chunk.
+    with django_assert_num_queries(8):
+        totals = list(delete_posts(Post.objects.all()))
+    assert totals == [n_posts]
+    assert not Post.objects.exists() and not Comment.objects.exists()
@@ -0,0 +1,61 @@
+from importlib import reload
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.test import AsyncClient, AsyncRequestFactory, override_settings
+from django.urls import clear_url_caches, resolve
+
+import blog.urls
+import blogicum.urls
+from blog import async_views
+from blog.metrics import MetricsMiddleware, registry
+
+
+async def async_get(path):
+    return await AsyncClient().get(path)
+
+
+def reload_urls():
+    # The URLconf picks the read views by ASYNC_VIEWS on import.
+    reload(blog.urls)
+    reload(blogicum.urls)
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_urls():
+    with override_settings(ASYNC_VIEWS=True):
+        reload_urls()
+        yield
+    reload_urls()
+
+
+# Async views query from a pool thread, which needs committed data.
+@pytest.mark.django_db(transaction=True)
+def test_async_middleware_chain(async_urls, post_with_published_location):
+    path = f"/posts/{post_with_published_location.id}/"
+    assert resolve(path).func is async_views.post_detail
+    registry.reset()
+    response = async_to_sync(async_get)(path)
+    assert response.status_code == 200, (
+        "Убедитесь, что страницы открываются при запуске через ASGI."
+    )
+    assert registry.views["blog:post_detail"]["queries"] == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_views_offload_queries(post_with_published_location):
+    request = AsyncRequestFactory().get("/")
+    request.user = AnonymousUser()
+    request.resolver_match = resolve("/")
+    registry.reset()
+    response = async_to_sync(MetricsMiddleware(async_views.index))(request)
+    assert response.status_code == 200
+    assert post_with_published_location.title in response.content.decode(
+        "utf-8"
+    )
+    assert registry.views["blog:index"]["queries"] > 0, (
+        "Убедитесь, что запросы из потоков асинхронных представлений"
+        " попадают в метрики запроса."
+    )
@@ -0,0 +1,196 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_fragment_cache(
+        user_client, another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.title in user_client.get("/").content.decode("utf-8")
+
+    Post.objects.filter(pk=post.pk).update(title="Обновлено в обход сигналов")
+    content = user_client.get("/").content.decode("utf-8")
+    assert post.title in content, (
+        "Убедитесь, что карточка публикации берётся из кеша фрагментов."
+    )
+
+    Post.objects.filter(pk=post.pk).update(
+        title="Обновлено вместе с updated_at", updated_at=timezone.now()
+    )
+    content = user_client.get("/").content.decode("utf-8")
+    assert "Обновлено вместе с updated_at" in content, (
+        "Убедитесь, что ключ кеша карточки зависит от `updated_at`."
+    )
+
+    post.category.title = "Новая категория"
+    post.category.save()
+    content = user_client.get("/").content.decode("utf-8")
+    assert "Новая категория" in content, (
+        "Убедитесь, что изменение категории сбрасывает кеш карточек."
+    )
+
+    another_user_client.post(
+        f"/posts/{post.id}/comment/", {"text": "Комментарий"}
+    )
+    content = user_client.get("/").content.decode("utf-8")
+    assert "Комментарии (1)" in content, (
+        "Убедитесь, что новый комментарий сбрасывает кеш карточки."
+    )
+
+
+def test_anonymous_page_cache(
+        mixer, user, unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    urls = (
+        "/",
+        f"/category/{post.category.slug}/",
+        f"/profile/{post.author.username}/",
+    )
+    for url in urls:
+        assert post.title in unlogged_client.get(url).content.decode("utf-8")
+
+    Post.objects.filter(pk=post.pk).update(title="Обновлено в обход сигналов")
+    for url in urls:
+        response = unlogged_client.get(url)
+        assert response.context is None, (
+            "Убедитесь, что страница для анонимного пользователя отдаётся"
+            " из кеша без рендеринга шаблона."
+        )
+        assert post.title in response.content.decode("utf-8")
+
+    post.title = "Новый заголовок"
+    post.save()
+    for url in urls:
+        content = unlogged_client.get(url).content.decode("utf-8")
+        assert "Новый заголовок" in content, (
+            "Убедитесь, что изменение публикации сбрасывает кеш страниц"
+            " ленты, категории и профиля."
+        )
+
+    scheduled = mixer.blend(
+        "blog.Post", author=user, category=post.category,
+        pub_date=timezone.now() + timedelta(seconds=1),
+    )
+    for url in urls:
+        unlogged_client.get(url)
+    time.sleep(1.2)
+    for url in urls:
+        content = unlogged_client.get(url).content.decode("utf-8")
+        assert scheduled.title in content, (
+            "Убедитесь, что кеш страницы истекает в момент отложенной"
+            " публикации."
+        )
+
+
+def test_conditional_get(
+        user_client, another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    for url in ("/", f"/posts/{post.id}/"):
+        response = another_user_client.get(url)
+        assert response.has_header("ETag") and response.has_header(
+            "Last-Modified"
+        ), "Убедитесь, что страница отдаёт заголовки ETag и Last-Modified."
+        not_modified = another_user_client.get(
+            url, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        assert not_modified.status_code == 304, (
+            "Убедитесь, что при совпадении ETag возвращается статус 304."
+        )
+        assert not_modified.context is None
+
+    detail_etag = another_user_client.get(f"/posts/{post.id}/")["ETag"]
+    index_etag = another_user_client.get("/")["ETag"]
+    another_user_client.post(
+        f"/posts/{post.id}/comment/", {"text": "Комментарий"}
+    )
+    for url, etag in (("/", index_etag), (f"/posts/{post.id}/", detail_etag)):
+        response = another_user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            "Убедитесь, что новый комментарий меняет ETag страницы."
+        )
+    detail_etag = another_user_client.get(f"/posts/{post.id}/")["ETag"]
+    assert user_client.get(
+        f"/posts/{post.id}/", HTTP_IF_NONE_MATCH=detail_etag
+    ).status_code == 200, "Убедитесь, что ETag зависит от пользователя."
+
+
+def test_publish_scheduled(
+        settings, tmp_path, mixer, user, unlogged_client, published_category
+):
+    # The command and the web workers share the cache across processes.
+    settings.CACHES = {"default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": str(tmp_path),
+    }}
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(minutes=10),
+    )
+    urls = (
+        "/",
+        f"/category/{published_category.slug}/",
+        f"/profile/{user.username}/",
+    )
+    for url in urls:
+        unlogged_client.get(url)
+    since = timezone.now()
+    Post.objects.filter(pk=post.pk).update(pub_date=timezone.now())
+
+    call_command(
+        "publish_scheduled", "--once", f"--since={since.isoformat()}"
+    )
+    for url in urls:
+        response = unlogged_client.get(url)
+        assert post.title in response.content.decode("utf-8"), (
+            "Убедитесь, что `publish_scheduled` сбрасывает кеш лент при"
+            " наступлении даты публикации."
+        )
+        assert response.context is None, (
+            "Убедитесь, что `publish_scheduled` прогревает кеш лент."
+        )
+
+
+def test_publish_scheduled_requires_shared_cache():
+    with pytest.raises(CommandError):
+        call_command("publish_scheduled", "--once")
+
+
+def test_author_delete_queries_do_not_grow(
+        mixer, unlogged_client, published_category
+):
+    def delete_author(n):
+        author = mixer.blend("auth.User")
+        posts = mixer.cycle(n).blend(
+            "blog.Post", author=author, category=published_category,
+            is_published=True, pub_date=timezone.now(),
+        )
+        assert posts[-1].title in unlogged_client.get("/").content.decode(
+            "utf-8"
+        )
+        with CaptureQueriesContext(connection) as queries:
+            author.delete()
+        # The next request resets the query log.
+        count = len(queries)
+        assert posts[-1].title not in unlogged_client.get(
+            "/"
+        ).content.decode("utf-8"), (
+            "Убедитесь, что удаление автора сбрасывает кеш ленты."
+        )
+        return count
+
+    assert delete_author(2) == delete_author(11), (
+        "Убедитесь, что число запросов при удалении автора не зависит от"
+        " числа его публикаций."
+    )
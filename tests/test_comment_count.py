@@ -0,0 +1,53 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_column(
+        mixer, user_client, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    for i in range(3):
+        user_client.post(f"/posts/{post.id}/comment/", {"text": f"text {i}"})
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что добавление комментария увеличивает счётчик"
+        " комментариев публикации."
+    )
+
+    comment = post.comments.first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что удаление комментария уменьшает счётчик"
+        " комментариев публикации."
+    )
+
+    mixer.cycle(2).blend("blog.Comment", post=post, author=another_user)
+    call_command("recount_comments", batch_size=1)
+    post.refresh_from_db()
+    assert post.comment_count == 4, (
+        "Убедитесь, что команда `recount_comments` восстанавливает счётчик"
+        " комментариев."
+    )
+
+
+def test_comment_count_after_commenter_deleted(
+        mixer, user, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post, author=another_user)
+    mixer.blend("blog.Comment", post=post, author=user)
+    own_post = mixer.blend("blog.Post", author=another_user)
+    mixer.blend("blog.Comment", post=own_post, author=another_user)
+    post.refresh_from_db()
+    post.comment_count = 4
+    post.save()
+
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == post.comments.count() == 1, (
+        "Убедитесь, что при удалении пользователя счётчики комментариев"
+        " чужих публикаций уменьшаются."
+    )
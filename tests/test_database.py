@@ -0,0 +1,58 @@
+import time
+
+import pytest
+from django.db import connection
+from django.http import HttpResponse
+from django.urls import resolve
+
+from blog.middleware import PINNED_UNTIL_KEY, ReplicaRoutingMiddleware
+from blog.routers import read_database
+
+
+@pytest.mark.django_db
+def test_sqlite_pragmas():
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA synchronous")
+        synchronous = cursor.fetchone()[0]
+        cursor.execute("PRAGMA busy_timeout")
+        busy_timeout = cursor.fetchone()[0]
+    assert synchronous == 1, (
+        "Убедитесь, что для соединений SQLite включён режим"
+        " `synchronous=NORMAL`."
+    )
+    assert busy_timeout == 5000
+
+
+def test_replica_routing(rf, settings):
+    settings.REPLICA_DATABASE = "replica"
+    session = {}
+    seen = []
+
+    def view(request):
+        seen.append(read_database.get())
+        return HttpResponse()
+
+    def get_response(request):
+        middleware.process_view(request, view, (), {})
+        return view(request)
+
+    middleware = ReplicaRoutingMiddleware(get_response)
+
+    def call(method, path):
+        request = getattr(rf, method)(path)
+        request.resolver_match = resolve(path)
+        request.session = session
+        middleware(request)
+        return seen[-1]
+
+    assert call("get", "/") == "replica", (
+        "Убедитесь, что лента читается из реплики."
+    )
+    assert call("get", "/posts/create/") == "default"
+    assert read_database.get() == "default"
+    assert call("post", "/posts/1/comment/") == "default"
+    assert call("get", "/posts/1/") == "default", (
+        "Убедитесь, что после записи сессия читает из основной базы."
+    )
+    session[PINNED_UNTIL_KEY] = time.time() - 1
+    assert call("get", "/posts/1/") == "replica"
@@ -0,0 +1,215 @@
+import hashlib
+import os
+import time
+from io import BytesIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import (InMemoryUploadedFile,
+                                            TemporaryUploadedFile)
+from django.core.management import call_command
+from django.core.files.storage import FileSystemStorage
+from django.test import RequestFactory
+from PIL import Image
+
+from blog.constants import IMAGE_VARIANT_WIDTHS
+from blog.images import generate_variants, release_image, variant_name
+from blog.models import Post
+from blog.storage import is_content_addressed
+
+pytestmark = [pytest.mark.django_db]
+
+
+def make_image(width, height, image_format="JPEG"):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color=(73, 109, 137)).save(
+        buffer, format=image_format
+    )
+    return buffer.getvalue()
+
+
+def test_image_variants(tmp_path, settings, user_client,
+                        post_with_published_location):
+    settings.MEDIA_ROOT = tmp_path
+    storage = FileSystemStorage(location=tmp_path)
+    name = storage.save("post_image/wide.jpg", ContentFile(make_image(800, 400)))
+    generate_variants(storage, name)
+    for width in IMAGE_VARIANT_WIDTHS:
+        for extension in ("webp", "jpg"):
+            variant = variant_name(name, width, extension)
+            assert storage.exists(variant) == (width < 800), (
+                "Убедитесь, что уменьшенные копии создаются только для"
+                " ширин меньше исходной."
+            )
+    with Image.open(storage.path(variant_name(name, 320, "webp"))) as image:
+        assert image.size == (320, 160)
+
+    post = post_with_published_location
+    post.image.name = name
+    post.save()
+    content = user_client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert "wide_640w.webp 640w" in content, (
+        "Убедитесь, что на странице публикации выводится srcset."
+    )
+
+
+@pytest.mark.parametrize(
+    ("limits", "error_code"),
+    [
+        ({}, None),
+        ({"MAX_IMAGE_UPLOAD_SIZE": 100}, "file_too_large"),
+        ({"MAX_IMAGE_PIXELS": 100}, "too_many_pixels"),
+    ],
+)
+def test_streamed_upload_limits(
+        tmp_path, settings, user_client, published_category, limits,
+        error_code
+):
+    settings.MEDIA_ROOT = tmp_path
+    for name, value in limits.items():
+        setattr(settings, name, value)
+    upload = ContentFile(make_image(300, 200), name="photo.jpg")
+    response = user_client.post("/posts/create/", {
+        "title": "Заголовок", "text": "Текст",
+        "pub_date": "2020-01-01T10:00", "category": published_category.id,
+        "is_published": True, "image": upload,
+    })
+    if error_code is None:
+        assert response.status_code == 302
+        return
+    form = response.context["form"]
+    assert form.has_error("image", error_code), (
+        "Убедитесь, что загрузка изображения сверх лимита отклоняется."
+    )
+
+
+@pytest.mark.parametrize(
+    ("max_memory_size", "file_class"),
+    [(2621440, InMemoryUploadedFile), (100, TemporaryUploadedFile)],
+)
+def test_upload_handlers(settings, max_memory_size, file_class):
+    settings.FILE_UPLOAD_MAX_MEMORY_SIZE = max_memory_size
+    data = make_image(300, 200)
+    request = RequestFactory().post("/", {
+        "image": ContentFile(data, name="photo.jpg")
+    })
+    upload = request.FILES["image"]
+    assert isinstance(upload, file_class), (
+        "Убедитесь, что небольшие загрузки не записываются на диск."
+    )
+    assert upload.read() == data
+    if file_class is TemporaryUploadedFile:
+        assert upload.content_hash == hashlib.sha256(data).hexdigest()
+
+
+def test_admin_rejects_oversized_upload(
+        tmp_path, settings, admin_client, admin_user, published_category
+):
+    settings.MEDIA_ROOT = tmp_path
+    settings.MAX_IMAGE_UPLOAD_SIZE = 100
+    # Spooled to disk, where HashingUploadHandler truncates it.
+    settings.FILE_UPLOAD_MAX_MEMORY_SIZE = 0
+    upload = ContentFile(make_image(300, 200), name="photo.jpg")
+    response = admin_client.post("/admin/blog/post/add/", {
+        "title": "Заголовок", "text": "Текст",
+        "pub_date_0": "2020-01-01", "pub_date_1": "10:00",
+        "author": admin_user.id, "category": published_category.id,
+        "is_published": True, "image": upload,
+    })
+    assert response.status_code == 200
+    assert response.context["adminform"].form.has_error(
+        "image", "file_too_large"
+    ), "Убедитесь, что админка не сохраняет обрезанные изображения."
+    assert not Post.objects.exists()
+
+
+def test_content_addressed_storage(
+        tmp_path, settings, user_client, published_category
+):
+    settings.MEDIA_ROOT = tmp_path
+    data = {
+        "title": "Заголовок", "text": "Текст",
+        "pub_date": "2020-01-01T10:00", "category": published_category.id,
+        "is_published": True,
+    }
+    for name in ("first.jpg", "second.jpg"):
+        user_client.post("/posts/create/", {
+            **data, "image": ContentFile(make_image(300, 200), name=name)
+        })
+    names = set(Post.objects.values_list("image", flat=True))
+    assert len(names) == 1, (
+        "Убедитесь, что одинаковые изображения хранятся в одном файле."
+    )
+    name = names.pop()
+    assert is_content_addressed(name)
+
+    storage = Post._meta.get_field("image").storage
+    orphan = storage.save(
+        "post_image/orphan.jpg", ContentFile(make_image(10, 10))
+    )
+    call_command("collect_orphan_images", min_age=0)
+    assert storage.exists(name)
+    assert not storage.exists(orphan), (
+        "Убедитесь, что `collect_orphan_images` удаляет неиспользуемые файлы."
+    )
+
+
+def test_release_image_keeps_reused_files(
+        tmp_path, settings, django_capture_on_commit_callbacks
+):
+    settings.MEDIA_ROOT = tmp_path
+    storage = Post._meta.get_field("image").storage
+    content = make_image(300, 200)
+    name = storage.save("post_image/photo.jpg", ContentFile(content))
+    an_hour_ago = time.time() - settings.ORPHAN_IMAGE_MIN_AGE - 1
+    os.utime(storage.path(name), (an_hour_ago, an_hour_ago))
+
+    # Another upload of the same bytes, its post not committed yet.
+    assert storage.save("post_image/copy.jpg", ContentFile(content)) == name
+    with django_capture_on_commit_callbacks(execute=True):
+        release_image(storage, name)
+    assert storage.exists(name), (
+        "Убедитесь, что файл, только что загруженный повторно, не удаляется."
+    )
+
+    os.utime(storage.path(name), (an_hour_ago, an_hour_ago))
+    with django_capture_on_commit_callbacks(execute=True):
+        release_image(storage, name)
+    assert not storage.exists(name)
+
+
+def test_serve_media(tmp_path, settings, client):
+    settings.MEDIA_ROOT = tmp_path
+    storage = Post._meta.get_field("image").storage
+    content = make_image(300, 200)
+    name = storage.save("post_image/photo.jpg", ContentFile(content))
+    url = f"/media/{name}"
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert b"".join(response.streaming_content) == content
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с хешем в имени отдаются как неизменяемые."
+    )
+    assert client.get(
+        url, HTTP_IF_NONE_MATCH=response["ETag"]
+    ).status_code == 304
+
+    partial = client.get(url, HTTP_RANGE="bytes=10-19")
+    assert partial.status_code == 206, (
+        "Убедитесь, что запросы с заголовком Range получают статус 206."
+    )
+    assert b"".join(partial.streaming_content) == content[10:20]
+    assert partial["Content-Range"] == f"bytes 10-19/{len(content)}"
+    assert client.get(url, HTTP_RANGE="bytes=-5").getvalue() == content[-5:]
+    assert client.get(
+        url, HTTP_RANGE=f"bytes={len(content)}-"
+    ).status_code == 416
+    assert client.get("/media/../settings.py").status_code == 404
+
+    settings.SENDFILE_BACKEND = "x-accel-redirect"
+    offloaded = client.get(url)
+    assert offloaded["X-Accel-Redirect"] == (
+        settings.MEDIA_ACCEL_PREFIX + name
+    )
+    assert not offloaded.content
@@ -0,0 +1,73 @@
+import logging
+
+import pytest
+from django.http import HttpResponse
+
+from blog.metrics import MetricsMiddleware, normalize_sql, registry
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_normalize_sql():
+    assert normalize_sql(
+        'SELECT "a"."id" FROM "a" WHERE ("a"."id" IN (1, 2, 3)'
+        " AND \"a\".\"name\" = 'x''y') LIMIT 21"
+    ) == normalize_sql(
+        'SELECT "a"."id" FROM "a"\n WHERE ("a"."id" IN (%s, %s)'
+        ' AND "a"."name" = %s) LIMIT 5'
+    )
+
+
+def test_metrics_endpoint(
+        settings, unlogged_client, user_client, post_with_published_location
+):
+    settings.METRICS_TOKEN = "secret"
+    registry.reset()
+    unlogged_client.get("/")
+    unlogged_client.get(f"/posts/{post_with_published_location.id}/")
+    assert unlogged_client.get("/metrics/").status_code == 404, (
+        "Убедитесь, что метрики недоступны без токена."
+    )
+    assert unlogged_client.get(
+        "/metrics/", HTTP_AUTHORIZATION="Bearer wrong"
+    ).status_code == 404
+    assert unlogged_client.get(
+        "/metrics/", HTTP_AUTHORIZATION="Bearer ä"
+    ).status_code == 404, (
+        "Убедитесь, что токен не из ASCII отклоняется без ошибки сервера."
+    )
+    assert user_client.get("/metrics/").status_code == 404
+    content = unlogged_client.get(
+        "/metrics/", HTTP_AUTHORIZATION="Bearer secret"
+    ).content.decode("utf-8")
+    assert 'blogicum_requests_total{view="blog:index"} 1' in content, (
+        "Убедитесь, что метрики собираются по имени представления."
+    )
+    assert 'blogicum_db_queries_total{view="blog:post_detail"} 2' in content
+    assert 'blogicum_template_seconds_total{view="blog:index"}' in content
+    assert (
+        'blogicum_request_duration_seconds_count{view="blog:index"} 1'
+        in content
+    )
+
+
+def test_repeated_queries_are_logged(
+        rf, caplog, monkeypatch, mixer, post_with_published_location
+):
+    monkeypatch.setattr(logging.getLogger("blog.metrics"), "propagate", True)
+    posts = mixer.cycle(6).blend(
+        "blog.Post", author=post_with_published_location.author
+    )
+
+    def view(request):
+        for post in posts:
+            Post.objects.get(pk=post.pk)
+        return HttpResponse()
+
+    with caplog.at_level(logging.WARNING, logger="blog.metrics"):
+        MetricsMiddleware(view)(rf.get("/"))
+    [record] = caplog.records
+    assert list(record.metrics["repeated"].values()) == [6], (
+        "Убедитесь, что повторяющиеся запросы одной формы отмечаются как N+1."
+    )
@@ -0,0 +1,100 @@
+import json
+import re
+from base64 import urlsafe_b64encode
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from blog.constants import NUMBER_OF_COMMENTS_ON_PAGE
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(POSTS_CURSOR_PAGINATION=True)
+def test_cursor_pagination(user_client, many_posts_with_published_locations):
+    seen = []
+    url = "/"
+    with CaptureQueriesContext(connection) as queries:
+        while url:
+            response = user_client.get(url)
+            page = list(response.context["page_obj"])
+            assert len(page) <= N_PER_PAGE
+            seen.extend(page)
+            next_link = re.search(
+                r'href="(\?cursor=[\w-]+)">\s*>>',
+                response.content.decode("utf-8"),
+            )
+            url = "/" + next_link.group(1) if next_link else None
+    assert len(seen) == len(many_posts_with_published_locations), (
+        "Убедитесь, что курсорная пагинация проходит по всем публикациям."
+    )
+    assert len({post.id for post in seen}) == len(seen), (
+        "Убедитесь, что при курсорной пагинации публикации не повторяются."
+    )
+    pub_dates = [post.pub_date for post in seen]
+    assert pub_dates == sorted(pub_dates, reverse=True), (
+        "Убедитесь, что курсорная пагинация сохраняет порядок публикаций."
+    )
+    assert not any(
+        "OFFSET" in query["sql"] for query in queries.captured_queries
+    ), "Убедитесь, что курсорная пагинация не использует OFFSET."
+
+    last_page = response.context["page_obj"]
+    assert last_page.has_previous()
+    previous_response = user_client.get(f"/?cursor={last_page.previous_cursor}")
+    previous_page = list(previous_response.context["page_obj"])
+    assert previous_page == seen[-len(last_page) - N_PER_PAGE:-len(last_page)]
+
+
+@override_settings(POSTS_CURSOR_PAGINATION=True)
+def test_cursor_pagination_bad_cursor(user_client, post_with_published_location):
+    response = user_client.get("/?cursor=not-a-cursor")
+    assert response.status_code == 200
+    assert list(response.context["page_obj"]) == [post_with_published_location]
+
+
+@pytest.mark.parametrize("payload", [
+    [[None, None], False],
+    [[{"created_at": 1}, "1"], False],
+    [["2020-01-01T00:00:00", 1], "yes"],
+])
+def test_comment_pages_bad_cursor(
+        mixer, unlogged_client, post_with_published_location, payload
+):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post)
+    cursor = urlsafe_b64encode(json.dumps(payload).encode()).decode()
+    response = unlogged_client.get(f"/posts/{post.id}/comments/?cursor={cursor}")
+    assert response.status_code == 200, (
+        "Убедитесь, что курсор с пустыми значениями или значениями не того"
+        " типа считается недействительным."
+    )
+    assert [c.id for c in response.context["comments"]] == [comment.id]
+
+
+def test_comment_pages(mixer, unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(NUMBER_OF_COMMENTS_ON_PAGE + 5).blend(
+        "blog.Comment", post=post
+    )
+    response = unlogged_client.get(f"/posts/{post.id}/")
+    first_page = response.context["comments"]
+    assert list(first_page) == comments[:NUMBER_OF_COMMENTS_ON_PAGE], (
+        "Убедитесь, что на странице публикации выводится первая страница"
+        " комментариев."
+    )
+    more_url = f"/posts/{post.id}/comments/?cursor={first_page.next_cursor}"
+    assert more_url in response.content.decode("utf-8")
+
+    fragment = unlogged_client.get(more_url)
+    assert [c.id for c in fragment.context["comments"]] == [
+        c.id for c in comments[NUMBER_OF_COMMENTS_ON_PAGE:]
+    ]
+    data = unlogged_client.get(more_url + "&format=json").json()
+    assert [c["id"] for c in data["comments"]] == [
+        c.id for c in comments[NUMBER_OF_COMMENTS_ON_PAGE:]
+    ]
+    assert data["next_cursor"] is None
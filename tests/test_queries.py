@@ -0,0 +1,93 @@
+import pytest
+from django.conf import settings
+
+from fixtures.queries import budget_report
+
+pytestmark = [pytest.mark.django_db]
+
+
+def count_selects(statements, table):
+    return sum(
+        1 for sql in statements
+        if sql.startswith("SELECT") and f'FROM "{table}"' in sql
+    )
+
+
+@pytest.mark.parametrize("method", ["get", "post"])
+@pytest.mark.parametrize(
+    ("url", "table"),
+    [
+        ("/posts/{post_id}/edit/", "blog_post"),
+        ("/posts/{post_id}/delete/", "blog_post"),
+        ("/posts/{post_id}/edit_comment/{comment_id}/", "blog_comment"),
+        ("/posts/{post_id}/delete_comment/{comment_id}/", "blog_comment"),
+    ],
+)
+def test_mutation_loads_object_once(
+        mixer, user, user_client, post_with_published_location, method, url,
+        table, query_budget
+):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    url = url.format(post_id=post.id, comment_id=comment.id)
+    data = {"text": "Новый текст"} if method == "post" else None
+    if method == "post" and "/edit/" in url:
+        data = {
+            "title": post.title, "text": post.text,
+            "pub_date": post.pub_date.strftime("%Y-%m-%dT%H:%M"),
+            "category": post.category_id, "is_published": True,
+        }
+    response = getattr(user_client, method)(url, data)
+    assert response.status_code in (200, 302)
+    assert count_selects(query_budget[-1].statements, table) == 1, (
+        f"Убедитесь, что при запросе {method.upper()} {url} объект"
+        " загружается из базы данных один раз."
+    )
+
+
+@pytest.mark.parametrize("n_comments", [0, 1, 15])
+def test_post_detail_query_count(
+        mixer, unlogged_client, another_user_client,
+        post_with_published_location, n_comments, query_budget
+):
+    post = post_with_published_location
+    mixer.cycle(n_comments).blend("blog.Comment", post=post)
+    response = unlogged_client.get(f"/posts/{post.id}/")
+    assert response.status_code == 200
+    statements = query_budget[-1].statements
+    assert len(statements) == 2, (
+        "Убедитесь, что страница публикации выполняет два запроса к базе"
+        " данных: публикация со связанными объектами и комментарии с"
+        f" авторами. Выполнено запросов: {len(statements)}."
+    )
+    another_user_client.get(f"/posts/{post.id}/")
+    session_and_user = 2
+    assert len(query_budget[-1].statements) == 2 + session_and_user
+
+
+def test_lazy_comment_authors_are_reported(
+        monkeypatch, mixer, unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(settings.METRICS_DUPLICATE_THRESHOLD).blend(
+        "blog.Comment", post=post
+    )
+    monkeypatch.setattr(
+        "blog.views.get_comments_page",
+        lambda post, cursor=None: post.comments.order_by("created_at"),
+    )
+    with pytest.raises(pytest.fail.Exception) as failure:
+        unlogged_client.get(f"/posts/{post.id}/")
+    report = str(failure.value)
+    assert "blog:post_detail" in report
+    assert 'FROM "auth_user"' in report
+
+
+def test_budget_report():
+    statements = [
+        f'SELECT "id" FROM "auth_user" WHERE "id" = {pk}' for pk in range(3)
+    ]
+    assert budget_report("blog:index", statements, 3, 4) is None
+    assert "при бюджете 2" in budget_report("blog:index", statements, 2, 4)
+    report = budget_report("blog:index", statements, None, 3)
+    assert '3 × SELECT "id" FROM "auth_user" WHERE "id" = ?' in report
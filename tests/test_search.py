@@ -0,0 +1,42 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_search(mixer, user, unlogged_client, published_category):
+    def blend(title, text, **kwargs):
+        return mixer.blend(
+            "blog.Post", title=title, text=text, author=user,
+            category=published_category, is_published=True, **kwargs
+        )
+
+    in_title = blend("Книги об осени", "Заметки")
+    in_text = blend("Заметки", "Читаю книгу у окна")
+    blend("Поезд", "Дорога к морю")
+    hidden = blend("Книга", "Черновик")
+    hidden.is_published = False
+    hidden.save()
+
+    response = unlogged_client.get("/search/", {"q": "книга"})
+    assert response.status_code == 200
+    results = list(response.context["page_obj"])
+    assert results == [in_title, in_text], (
+        "Убедитесь, что поиск находит словоформы, ранжирует совпадения в"
+        " заголовке выше и не показывает неопубликованные записи."
+    )
+
+    in_text.text = "Другой текст"
+    in_text.save()
+    in_title.delete()
+    response = unlogged_client.get("/search/", {"q": "книга"})
+    assert not list(response.context["page_obj"]), (
+        "Убедитесь, что индекс обновляется при изменении и удалении записи."
+    )
+
+    Post.objects.filter(pk=in_text.pk).update(title="Книжная полка")
+    call_command("rebuild_search_index", verbosity=0)
+    response = unlogged_client.get("/search/", {"q": "полки"})
+    assert list(response.context["page_obj"]) == [in_text]
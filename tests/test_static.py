@@ -0,0 +1,57 @@
+import gzip
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from PIL import Image
+
+
+@pytest.fixture
+def collected(tmp_path, settings):
+    settings.STATIC_ROOT = tmp_path
+    call_command("collectstatic", interactive=False, verbosity=0)
+    return tmp_path
+
+
+def test_collectstatic_pipeline(collected):
+    css = staticfiles_storage.stored_name("css/bootstrap.min.css")
+    assert css != "css/bootstrap.min.css", (
+        "Убедитесь, что `collectstatic` добавляет хеш к именам файлов."
+    )
+    original = (collected / css).read_bytes()
+    assert gzip.decompress((collected / f"{css}.gz").read_bytes()) == (
+        original
+    ), "Убедитесь, что рядом с файлами сохраняются сжатые gzip копии."
+
+    logo = staticfiles_storage.stored_name("img/logo.png")
+    with Image.open(collected / logo) as optimized, Image.open(
+        "blogicum/static_dev/img/logo.png"
+    ) as source:
+        assert optimized.tobytes() == source.tobytes(), (
+            "Убедитесь, что оптимизация PNG не меняет изображение."
+        )
+
+
+def test_serve_static(collected, client):
+    css = staticfiles_storage.stored_name("css/bootstrap.min.css")
+    response = client.get(f"/static/{css}", HTTP_ACCEPT_ENCODING="gzip")
+    assert response.status_code == 200
+    assert response["Content-Encoding"] == "gzip"
+    assert response["Content-Type"] == "text/css"
+    assert "Accept-Encoding" in response["Vary"]
+    assert "immutable" in response["Cache-Control"], (
+        "Убедитесь, что файлы с хешем в имени кешируются навсегда."
+    )
+
+    plain = client.get("/static/css/bootstrap.min.css")
+    assert not plain.has_header("Content-Encoding")
+    assert "immutable" not in plain["Cache-Control"]
+
+
+@pytest.mark.django_db
+def test_base_template_uses_local_bootstrap(client):
+    content = client.get("/").content.decode("utf-8")
+    assert "/static/css/bootstrap.min.css" in content, (
+        "Убедитесь, что стили Bootstrap подключаются из статики проекта."
+    )
+    assert "cdn.jsdelivr.net" not in content
@@ -0,0 +1,59 @@
+import logging
+from runpy import run_path
+
+import pytest
+from django.template import engines
+from django.template.loaders.cached import Loader
+
+import blogicum.settings
+from blog.metrics import registry
+from blog.templating import warm_templates
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_warm_templates():
+    loader = engines["django"].engine.template_loaders[0]
+    assert isinstance(loader, Loader), (
+        "Убедитесь, что шаблоны загружаются кеширующим загрузчиком."
+    )
+    loader.reset()
+    assert warm_templates() > 0
+    assert {
+        "base.html", "includes/header.html", "includes/post_card.html",
+        "blog/index.html",
+    } <= set(loader.get_template_cache)
+
+
+@pytest.mark.parametrize("reload, cached", [("", True), ("1", False)])
+def test_template_reload_switch(monkeypatch, reload, cached):
+    monkeypatch.setenv("TEMPLATE_RELOAD", reload)
+    config = run_path(blogicum.settings.__file__)
+    loader, *_ = config["TEMPLATES"][0]["OPTIONS"]["loaders"]
+    is_cached = isinstance(loader, tuple) and (
+        loader[0] == "django.template.loaders.cached.Loader"
+    )
+    assert is_cached == cached, (
+        "Убедитесь, что шаблоны кешируются, пока не задан TEMPLATE_RELOAD."
+    )
+
+
+def test_template_profiling(
+        settings, caplog, monkeypatch, unlogged_client,
+        post_with_published_location
+):
+    monkeypatch.setattr(logging.getLogger("blog.metrics"), "propagate", True)
+    settings.TEMPLATE_PROFILING = True
+    registry.reset()
+    with caplog.at_level(logging.INFO, logger="blog.metrics"):
+        unlogged_client.get("/")
+    content = registry.render()
+    assert 'blogicum_template_renders_total{template="blog/index.html"} 1' in (
+        content
+    )
+    assert (
+        'blogicum_include_renders_total{template="includes/post_card.html",'
+        'node="blog/index.html:8"} 1'
+    ) in content, "Убедитесь, что время учитывается по каждому include."
+    record, = [r for r in caplog.records if r.getMessage() == "request"]
+    assert "base.html" in record.metrics["templates"]